@@ -1,13 +1,16 @@
-import bisect
 import collections
-import inspect
+import heapq
 import io
+import itertools
 import json
 import queue
+import shutil
 import threading
 import time
 import logging
 import traceback
+import types
+import weakref
 from typing import Union
 
 from . import exception
@@ -42,9 +45,8 @@ def flavor(msg):
         return 'shipping_query'
     if 'id' in msg and 'total_amount' in msg:
         return 'pre_checkout_query'
-    top_keys = list(msg.keys())
-    if len(top_keys) == 1:
-        return top_keys[0]
+    if len(msg) == 1:
+        return next(iter(msg))
 
     raise exception.BadFlavor(msg)
 
@@ -59,7 +61,7 @@ def _find_first_key(d, keys):
             return k
     logging.error('No suggested keys %s in %s', str(keys), str(d))
     # Gets the first key after the update_id one.
-    return list(d.keys())[1]
+    return next(itertools.islice(d, 1, None))
 
 
 all_content_types = [
@@ -70,6 +72,76 @@ all_content_types = [
     'new_chat_members', 'invoice', 'successful_payment'
 ]
 
+all_update_types = [
+    'message', 'edited_message', 'channel_post', 'edited_channel_post', 'inline_query',
+    'chosen_inline_result', 'callback_query', 'shipping_query', 'pre_checkout_query', 'poll',
+    'poll_answer', 'my_chat_member', 'chat_member'
+]
+
+_update_types = tuple(all_update_types)  # `message` first, the most common by far
+
+
+def _find_update_type(update):
+    # An update carries exactly one of these keys, besides `update_id`.
+    for k in _update_types:
+        if k in update:
+            return k
+    return _find_first_key(update, all_update_types)  # log and fall back
+
+
+# Position of each content type in `all_content_types`. When a message carries
+# more than one of them (e.g. ``location`` and ``venue``), the earliest wins.
+_content_type_rank = {t: i for i, t in enumerate(all_content_types)}
+
+
+def _find_content_type(msg):
+    found = _content_type_rank.keys() & msg.keys()
+    if len(found) == 1:
+        return found.pop()
+    if found:
+        return min(found, key=_content_type_rank.__getitem__)
+    return _find_first_key(msg, all_content_types)  # log and fall back
+
+
+def _glance_chat(msg, long):
+    content_type = _find_content_type(msg)
+
+    if long:
+        return content_type, msg['chat']['type'], msg['chat']['id'], msg['date'], msg['message_id']
+    return content_type, msg['chat']['type'], msg['chat']['id']
+
+
+def _glance_callback_query(msg, long):
+    return msg['id'], msg['from']['id'], msg['data']
+
+
+def _glance_inline_query(msg, long):
+    if long:
+        return msg['id'], msg['from']['id'], msg['query'], msg['offset']
+    return msg['id'], msg['from']['id'], msg['query']
+
+
+def _glance_chosen_inline_result(msg, long):
+    return msg['result_id'], msg['from']['id'], msg['query']
+
+
+def _glance_shipping_query(msg, long):
+    return msg['id'], msg['from']['id'], msg['invoice_payload']
+
+
+def _glance_pre_checkout_query(msg, long):
+    if long:
+        return msg['id'], msg['from']['id'], msg['invoice_payload'], msg['currency'], msg['total_amount']
+    return msg['id'], msg['from']['id'], msg['invoice_payload']
+
+
+_glance_table = {'chat': _glance_chat,
+                 'callback_query': _glance_callback_query,
+                 'inline_query': _glance_inline_query,
+                 'chosen_inline_result': _glance_chosen_inline_result,
+                 'shipping_query': _glance_shipping_query,
+                 'pre_checkout_query': _glance_pre_checkout_query}
+
 
 def glance(msg, flavor='chat', long=False):
     """
@@ -115,44 +187,12 @@ def glance(msg, flavor='chat', long=False):
     - short: (``msg['id']``, ``msg['from']['id']``, ``msg['invoice_payload']``)
     - long: (``msg['id']``, ``msg['from']['id']``, ``msg['invoice_payload']``, ``msg['currency']``, ``msg['total_amount']``)
     """
-
-    def gl_chat():
-        content_type = _find_first_key(msg, all_content_types)
-
-        if long:
-            return content_type, msg['chat']['type'], msg['chat']['id'], msg['date'], msg['message_id']
-        return content_type, msg['chat']['type'], msg['chat']['id']
-
-    def gl_callback_query():
-        return msg['id'], msg['from']['id'], msg['data']
-
-    def gl_inline_query():
-        if long:
-            return msg['id'], msg['from']['id'], msg['query'], msg['offset']
-        return msg['id'], msg['from']['id'], msg['query']
-
-    def gl_chosen_inline_result():
-        return msg['result_id'], msg['from']['id'], msg['query']
-
-    def gl_shipping_query():
-        return msg['id'], msg['from']['id'], msg['invoice_payload']
-
-    def gl_pre_checkout_query():
-        if long:
-            return msg['id'], msg['from']['id'], msg['invoice_payload'], msg['currency'], msg['total_amount']
-        return msg['id'], msg['from']['id'], msg['invoice_payload']
-
     try:
-        fn = {'chat': gl_chat,
-              'callback_query': gl_callback_query,
-              'inline_query': gl_inline_query,
-              'chosen_inline_result': gl_chosen_inline_result,
-              'shipping_query': gl_shipping_query,
-              'pre_checkout_query': gl_pre_checkout_query}[flavor]
+        fn = _glance_table[flavor]
     except KeyError:
         raise exception.BadFlavor(flavor)
 
-    return fn()
+    return fn(msg, long)
 
 
 def flance(msg, long=False):
@@ -171,7 +211,7 @@ def peel(event):
     Remove an event's top-level skin (where its flavor is determined), and return
     the core content.
     """
-    return list(event.values())[0]
+    return next(iter(event.values()))
 
 
 def fleece(event):
@@ -187,7 +227,8 @@ def is_event(msg):
     Return whether the message looks like an event. That is, whether it has a flavor
     that starts with an underscore.
     """
-    return flavor(msg).startswith('_')
+    # Only the single-top-key case of `flavor()` can yield an underscore flavor.
+    return len(msg) == 1 and next(iter(msg)).startswith('_')
 
 
 def origin_identifier(msg):
@@ -236,11 +277,6 @@ def _split_input_media_array(media_array):
             return input_media
         raise ValueError()
 
-    def given_attach_name(input_media):
-        if isinstance(input_media['media'], tuple):
-            return input_media['media'][0]
-        return None
-
     def attach_name_generator(used_names):
         x = 0
         while 1:
@@ -250,12 +286,19 @@ def _split_input_media_array(media_array):
                 continue
             yield name
 
-    def split_media(input_media, name_generator):
-        file_spec = input_media['media']
+    ms = [ensure_dict(m) for m in media_array]
+
+    used_names = {m['media'][0] for m in ms if isinstance(m['media'], tuple)}
+    name_generator = attach_name_generator(used_names)
+
+    legal_media, files_to_attach = [], {}
+    for m in ms:
+        file_spec = m['media']
 
         # file_id, URL
-        if _isstring(file_spec):
-            return input_media, None
+        if isinstance(file_spec, str):
+            legal_media.append(m)
+            continue
 
         # file-object
         # (attach-name, file-object)
@@ -265,37 +308,27 @@ def _split_input_media_array(media_array):
         else:
             name, f = next(name_generator), file_spec
 
-        m = input_media.copy()
+        m = m.copy()
         m['media'] = 'attach://' + name
 
-        return (m, (name, f))
-
-    ms = [ensure_dict(m) for m in media_array]
-
-    used_names = [given_attach_name(m) for m in ms if given_attach_name(m) is not None]
-    name_generator = attach_name_generator(used_names)
-
-    splitted = [split_media(m, name_generator) for m in ms]
-
-    legal_media, attachments = map(list, zip(*splitted))
-    files_to_attach = dict([a for a in attachments if a is not None])
+        legal_media.append(m)
+        files_to_attach[name] = f
 
     return legal_media, files_to_attach
 
 
-def _isstring(s):
-    return isinstance(s, str)
-
-
-def _isfile(f):
-    return isinstance(f, io.IOBase)
+from . import helper
 
 
-from . import helper
+# Routers already made by `flavor_router`, by id() of their routing table. A router holds on
+# to its table, so an id cannot be reused while its entry is alive.
+_flavor_routers = weakref.WeakValueDictionary()
 
 
 def flavor_router(routing_table):
-    router = helper.Router(flavor, routing_table)
+    router = _flavor_routers.get(id(routing_table))
+    if router is None:
+        router = _flavor_routers[id(routing_table)] = helper.Router(flavor, routing_table)
     return router.route
 
 
@@ -307,31 +340,74 @@ class _BotBase:
         self._file_chunk_size = 65536
 
 
-def _strip(params, more=None):
-    if more is None:
-        more = []
-    return {key: value for key, value in params.items() if key not in ['self'] + more}
+# Names excluded by `_strip`, built once for every distinct `more` tuple
+# (i.e. once per endpoint) instead of on every call.
+_strip_exclusions = {}
 
 
-def _rectify(params):
-    def make_jsonable(value):
-        if isinstance(value, list):
-            return [make_jsonable(v) for v in value]
-        if isinstance(value, dict):
-            return {k: make_jsonable(v) for k, v in value.items() if v is not None}
-        if isinstance(value, tuple) and hasattr(value, '_asdict'):
-            return {k: make_jsonable(v) for k, v in value._asdict().items() if v is not None}
-        return value
-
-    def flatten(value):
-        v = make_jsonable(value)
-
-        if isinstance(v, (dict, list)):
-            return json.dumps(v, separators=(',', ':'))
-        return v
+def _strip(params, more=()):
+    try:
+        excluded = _strip_exclusions[more]
+    except KeyError:
+        excluded = _strip_exclusions[more] = frozenset(('self',) + tuple(more))
+    # Unset (None) arguments are dropped here already, so `_rectify` has fewer to go through.
+    return {key: value for key, value in params.items() if value is not None and key not in excluded}
+
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_dumps(value):
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode('utf-8')
+        except TypeError:  # e.g. non-str dict keys, which json tolerates
+            pass
+    return json.dumps(value, separators=(',', ':'))
 
+
+def _json_loads(data):
+    # Takes str, bytes or bytearray alike.
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except ValueError:  # e.g. integers beyond 64 bits; let json decide
+            pass
+    return json.loads(data)
+
+
+# Leaf types returned by `_make_jsonable` as they are. Testing for them in place
+# saves a recursive call per leaf, which are most of the values in a payload.
+_json_scalar_types = frozenset([str, int, float, bool])
+
+
+def _make_jsonable(value):
+    if isinstance(value, list):
+        return [v if type(v) in _json_scalar_types else _make_jsonable(v) for v in value]
+    if isinstance(value, dict):
+        return {k: v if type(v) in _json_scalar_types else _make_jsonable(v)
+                for k, v in value.items() if v is not None}
+    if isinstance(value, tuple) and hasattr(value, '_asdict'):
+        return {k: v if type(v) in _json_scalar_types else _make_jsonable(v)
+                for k, v in value._asdict().items() if v is not None}
+    return value
+
+
+def _rectify(params):
     # remove None, then json-serialize if needed
-    return {k: flatten(v) for k, v in params.items() if v is not None}
+    rectified = {}
+    for k, v in params.items():
+        if v is None:
+            continue
+        # Scalars pass through untouched; only containers need serializing.
+        if type(v) not in _json_scalar_types and (
+                isinstance(v, (dict, list)) or (isinstance(v, tuple) and hasattr(v, '_asdict'))):
+            v = _json_dumps(_make_jsonable(v))
+        rectified[k] = v
+    return rectified
 
 
 from . import api
@@ -339,19 +415,17 @@ from . import api
 
 class Bot(_BotBase):
     class Scheduler(threading.Thread):
-        # A class that is sorted by timestamp. Use `bisect` module to ensure order in event queue.
         Event = collections.namedtuple('Event', ['timestamp', 'data'])
-        Event.__eq__ = lambda self, other: self.timestamp == other.timestamp
-        Event.__ne__ = lambda self, other: self.timestamp != other.timestamp
-        Event.__gt__ = lambda self, other: self.timestamp > other.timestamp
-        Event.__ge__ = lambda self, other: self.timestamp >= other.timestamp
-        Event.__lt__ = lambda self, other: self.timestamp < other.timestamp
-        Event.__le__ = lambda self, other: self.timestamp <= other.timestamp
 
         def __init__(self):
             super(Bot.Scheduler, self).__init__()
+            # A heap of (timestamp, sequence, event). The sequence number keeps events with
+            # identical timestamps in insertion order, and spares comparing events themselves.
             self._eventq = []
+            self._sequence = itertools.count()
+            self._pending = set()  # id() of events neither emitted nor cancelled yet
             self._lock = threading.RLock()  # reentrant lock to allow locked method calling locked method
+            self._wakeup = threading.Condition(self._lock)  # signalled when an event is inserted
             self._event_handler = None
 
         def _locked(fn):
@@ -364,40 +438,46 @@ class Bot(_BotBase):
         @_locked
         def _insert_event(self, data, when):
             ev = self.Event(when, data)
-            bisect.insort(self._eventq, ev)
+            heapq.heappush(self._eventq, (when, next(self._sequence), ev))
+            self._pending.add(id(ev))
+            self._wakeup.notify()  # new event may be due sooner than the one being waited for
             return ev
 
         @_locked
         def _remove_event(self, event):
-            # Find event according to its timestamp.
-            # Index returned should be one behind.
-            i = bisect.bisect(self._eventq, event)
-
-            # Having two events with identical timestamp is unlikely but possible.
-            # I am going to move forward and compare timestamp AND object address
-            # to make sure the correct object is found.
-
-            while i > 0:
-                i -= 1
-                e = self._eventq[i]
-
-                if e.timestamp != event.timestamp:
-                    raise exception.EventNotFound(event)
-                if id(e) == id(event):
-                    self._eventq.pop(i)
-                    return
-
-            raise exception.EventNotFound(event)
+            # Cancelled events stay in the heap and are skipped when they reach the top.
+            try:
+                self._pending.remove(id(event))
+            except KeyError:
+                raise exception.EventNotFound(event)
 
         @_locked
         def _pop_expired_event(self):
-            if not self._eventq:
-                return None
-
-            if self._eventq[0].timestamp <= time.time():
-                return self._eventq.pop(0)
+            while self._eventq:
+                timestamp, _, e = self._eventq[0]
+
+                if id(e) not in self._pending:
+                    heapq.heappop(self._eventq)  # cancelled, discard
+                elif timestamp <= time.time():
+                    heapq.heappop(self._eventq)
+                    self._pending.remove(id(e))
+                    return e
+                else:
+                    return None
             return None
 
+        @_locked
+        def _wait_expired_event(self):
+            while 1:
+                e = self._pop_expired_event()
+                if e:
+                    return e
+
+                # Sleep until the earliest event is due, or indefinitely if there is none.
+                # Inserting an event wakes us up early to re-evaluate.
+                timeout = self._eventq[0][0] - time.time() if self._eventq else None
+                self._wakeup.wait(timeout)
+
         def event_at(self, when, data):
             """
             Schedule some data to emit at an absolute timestamp.
@@ -437,17 +517,13 @@ class Bot(_BotBase):
 
         def run(self):
             while 1:
-                e = self._pop_expired_event()
-                while e:
-                    if callable(e.data):
-                        d = e.data()  # call the data-producing function
-                        if d is not None:
-                            self._event_handler(d)
-                    else:
-                        self._event_handler(e.data)
-
-                    e = self._pop_expired_event()
-                time.sleep(0.1)
+                e = self._wait_expired_event()  # lock is released before handling
+                if callable(e.data):
+                    d = e.data()  # call the data-producing function
+                    if d is not None:
+                        self._event_handler(d)
+                else:
+                    self._event_handler(e.data)
 
         def run_as_thread(self):
             self.daemon = True
@@ -461,12 +537,10 @@ class Bot(_BotBase):
 
         self._scheduler = self.Scheduler()
 
-        self._router = helper.Router(flavor, {'chat': lambda msg: self.on_chat_message(msg),
-                                              'callback_query': lambda msg: self.on_callback_query(msg),
-                                              'inline_query': lambda msg: self.on_inline_query(msg),
-                                              'chosen_inline_result': lambda msg: self.on_chosen_inline_result(msg)})
-        # use lambda to delay evaluation of self.on_ZZZ to runtime because
-        # I don't want to require defining all methods right here.
+        self._router = helper.Router(flavor, {'chat': helper._create_invoker(self, 'on_chat_message'),
+                                              'callback_query': helper._create_invoker(self, 'on_callback_query'),
+                                              'inline_query': helper._create_invoker(self, 'on_inline_query'),
+                                              'chosen_inline_result': helper._create_invoker(self, 'on_chosen_inline_result')})
 
     @property
     def scheduler(self):
@@ -484,13 +558,18 @@ class Bot(_BotBase):
                            raise_errors=raise_errors if raise_errors is not None else self._raise_errors, **kwargs)
 
     def _api_request_with_file(self, method, params, files, **kwargs):
-        params.update({
-            k: v for k, v in files.items() if _isstring(v)})
-
-        files = {
-            k: v for k, v in files.items() if v is not None and not _isstring(v)}
+        # file_id/URL strings go along with other parameters, file objects get uploaded.
+        uploads = {}
+        for k, v in files.items():
+            if v is None:
+                continue
+            if isinstance(v, str):
+                params[k] = v
+            else:
+                uploads[k] = v
 
-        return self._api_request(method, _rectify(params), files, **kwargs)
+        # `params` comes rectified from the caller, and file_id/URL strings need no rectifying.
+        return self._api_request(method, params, uploads, **kwargs)
 
     def getMe(self):
         """ See: https://core.telegram.org/bots/api#getme """
@@ -551,7 +630,7 @@ class Bot(_BotBase):
             - file-like object: obtained by ``open(path, 'rb')``
             - tuple: (filename, file-like object).
         """
-        p = _strip(locals(), more=['photo'])
+        p = _strip(locals(), more=('photo',))
         return self._api_request_with_file('sendPhoto', _rectify(p), {'photo': photo})
 
     def sendAudio(self, chat_id: Union[int, str], audio,
@@ -571,7 +650,7 @@ class Bot(_BotBase):
 
         :param audio: Same as ``photo`` in :meth:`amanobot.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['audio', 'thumb'])
+        p = _strip(locals(), more=('audio', 'thumb'))
         return self._api_request_with_file('sendAudio', _rectify(p), {'audio': audio, 'thumb': thumb})
 
     def sendDocument(self, chat_id: Union[int, str], document,
@@ -589,7 +668,7 @@ class Bot(_BotBase):
 
         :param document: Same as ``photo`` in :meth:`amanobot.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['document', 'thumb'])
+        p = _strip(locals(), more=('document', 'thumb'))
         return self._api_request_with_file('sendDocument', _rectify(p), {'document': document, 'thumb': thumb})
 
     def sendVideo(self, chat_id: Union[int, str], video,
@@ -610,7 +689,7 @@ class Bot(_BotBase):
 
         :param video: Same as ``photo`` in :meth:`amanobot.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['video', 'thumb'])
+        p = _strip(locals(), more=('video', 'thumb'))
         return self._api_request_with_file('sendVideo', _rectify(p), {'video': video, 'thumb': thumb})
 
     def sendAnimation(self, chat_id: Union[int, str], animation,
@@ -630,7 +709,7 @@ class Bot(_BotBase):
 
         :param animation: Same as ``photo`` in :meth:`amanobot.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['animation', 'thumb'])
+        p = _strip(locals(), more=('animation', 'thumb'))
         return self._api_request_with_file('sendAnimation', _rectify(p), {'animation': animation, 'thumb': thumb})
 
     def sendVoice(self, chat_id: Union[int, str], voice,
@@ -647,7 +726,7 @@ class Bot(_BotBase):
 
         :param voice: Same as ``photo`` in :meth:`amanobot.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['voice'])
+        p = _strip(locals(), more=('voice',))
         return self._api_request_with_file('sendVoice', _rectify(p), {'voice': voice})
 
     def sendVideoNote(self, chat_id: Union[int, str], video_note,
@@ -668,7 +747,7 @@ class Bot(_BotBase):
             it being specified. Supply any integer you want. It seems to have no effect
             on the video note's display size.
         """
-        p = _strip(locals(), more=['video_note', 'thumb'])
+        p = _strip(locals(), more=('video_note', 'thumb'))
         return self._api_request_with_file('sendVideoNote', _rectify(p), {'video_note': video_note, 'thumb': thumb})
 
     def sendMediaGroup(self, chat_id: Union[int, str], media,
@@ -694,7 +773,7 @@ class Bot(_BotBase):
             amanobot assigns unique names to each uploaded file. Names assigned by
             amanobot will not collide with user-supplied names, if any.
         """
-        p = _strip(locals(), more=['media'])
+        p = _strip(locals(), more=('media',))
         legal_media, files_to_attach = _split_input_media_array(media)
 
         p['media'] = legal_media
@@ -723,7 +802,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as in :meth:`.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return self._api_request('editMessageLiveLocation', _rectify(p))
 
@@ -734,7 +813,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as in :meth:`.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return self._api_request('stopMessageLiveLocation', _rectify(p))
 
@@ -859,14 +938,14 @@ class Bot(_BotBase):
                            permissions=None):
         """ See: https://core.telegram.org/bots/api#restrictchatmember """
         if not isinstance(permissions, dict):
-            permissions = dict(can_send_messages=can_send_messages,
-                               can_send_media_messages=can_send_media_messages,
-                               can_send_polls=can_send_polls,
-                               can_send_other_messages=can_send_other_messages,
-                               can_add_web_page_previews=can_add_web_page_previews,
-                               can_change_info=can_change_info,
-                               can_invite_users=can_invite_users,
-                               can_pin_messages=can_pin_messages)
+            permissions = {'can_send_messages': can_send_messages,
+                           'can_send_media_messages': can_send_media_messages,
+                           'can_send_polls': can_send_polls,
+                           'can_send_other_messages': can_send_other_messages,
+                           'can_add_web_page_previews': can_add_web_page_previews,
+                           'can_change_info': can_change_info,
+                           'can_invite_users': can_invite_users,
+                           'can_pin_messages': can_pin_messages}
         p = _strip(locals())
         return self._api_request('restrictChatMember', _rectify(p))
 
@@ -904,14 +983,14 @@ class Bot(_BotBase):
                            permissions=None):
         """ See: https://core.telegram.org/bots/api#setchatpermissions """
         if not isinstance(permissions, dict):
-            permissions = dict(can_send_messages=can_send_messages,
-                               can_send_media_messages=can_send_media_messages,
-                               can_send_polls=can_send_polls,
-                               can_send_other_messages=can_send_other_messages,
-                               can_add_web_page_previews=can_add_web_page_previews,
-                               can_change_info=can_change_info,
-                               can_invite_users=can_invite_users,
-                               can_pin_messages=can_pin_messages)
+            permissions = {'can_send_messages': can_send_messages,
+                           'can_send_media_messages': can_send_media_messages,
+                           'can_send_polls': can_send_polls,
+                           'can_send_other_messages': can_send_other_messages,
+                           'can_add_web_page_previews': can_add_web_page_previews,
+                           'can_change_info': can_change_info,
+                           'can_invite_users': can_invite_users,
+                           'can_pin_messages': can_pin_messages}
         p = _strip(locals())
         return self._api_request('setChatPermissions', _rectify(p))
 
@@ -942,7 +1021,7 @@ class Bot(_BotBase):
 
     def setChatPhoto(self, chat_id: Union[int, str], photo):
         """ See: https://core.telegram.org/bots/api#setchatphoto """
-        p = _strip(locals(), more=['photo'])
+        p = _strip(locals(), more=('photo',))
         return self._api_request_with_file('setChatPhoto', _rectify(p), {'photo': photo})
 
     def deleteChatPhoto(self, chat_id):
@@ -1065,7 +1144,7 @@ class Bot(_BotBase):
             or simply ``inline_message_id``.
             You may extract this value easily with :meth:`amanobot.message_identifier`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return self._api_request('editMessageText', _rectify(p))
 
@@ -1079,7 +1158,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as ``msg_identifier`` in :meth:`amanobot.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return self._api_request('editMessageCaption', _rectify(p))
 
@@ -1090,7 +1169,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as ``msg_identifier`` in :meth:`amanobot.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier', 'media'])
+        p = _strip(locals(), more=('msg_identifier', 'media'))
         p.update(_dismantle_message_identifier(msg_identifier))
 
         legal_media, files_to_attach = _split_input_media_array([media])
@@ -1105,7 +1184,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as ``msg_identifier`` in :meth:`amanobot.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return self._api_request('editMessageReplyMarkup', _rectify(p))
 
@@ -1118,7 +1197,7 @@ class Bot(_BotBase):
             a 2-tuple (``chat_id``, ``message_id``).
             You may extract this value easily with :meth:`amanobot.message_identifier`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return self._api_request('stopPoll', _rectify(p))
 
@@ -1130,7 +1209,7 @@ class Bot(_BotBase):
             Same as ``msg_identifier`` in :meth:`amanobot.Bot.editMessageText`,
             except this method does not work on inline messages.
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return self._api_request('deleteMessage', _rectify(p))
 
@@ -1144,7 +1223,7 @@ class Bot(_BotBase):
 
         :param sticker: Same as ``photo`` in :meth:`amanobot.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['sticker'])
+        p = _strip(locals(), more=('sticker',))
         return self._api_request_with_file('sendSticker', _rectify(p), {'sticker': sticker})
 
     def getStickerSet(self, name):
@@ -1158,7 +1237,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#uploadstickerfile
         """
-        p = _strip(locals(), more=['png_sticker'])
+        p = _strip(locals(), more=('png_sticker',))
         return self._api_request_with_file('uploadStickerFile', _rectify(p), {'png_sticker': png_sticker})
 
     def createNewStickerSet(self, user_id, name, title, emojis,
@@ -1169,7 +1248,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#createnewstickerset
         """
-        p = _strip(locals(), more=['png_sticker', 'tgs_sticker'])
+        p = _strip(locals(), more=('png_sticker', 'tgs_sticker'))
         return self._api_request_with_file('createNewStickerSet', _rectify(p),
                                            {'png_sticker': png_sticker, 'tgs_sticker': tgs_sticker})
 
@@ -1180,7 +1259,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#addstickertoset
         """
-        p = _strip(locals(), more=['png_sticker', 'tgs_sticker'])
+        p = _strip(locals(), more=('png_sticker', 'tgs_sticker'))
         return self._api_request_with_file('addStickerToSet', _rectify(p),
                                            {'png_sticker': png_sticker, 'tgs_sticker': tgs_sticker})
 
@@ -1203,7 +1282,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#setstickersetthumb
         """
-        p = _strip(locals(), more=['thumb'])
+        p = _strip(locals(), more=('thumb',))
         return self._api_request_with_file('setStickerSetThumb', _rectify(p), {'thumb': thumb})
 
     def answerInlineQuery(self, inline_query_id, results,
@@ -1223,9 +1302,8 @@ class Bot(_BotBase):
                    allowed_updates=None,
                    _raise_errors=None):
         """ See: https://core.telegram.org/bots/api#getupdates """
-        if _raise_errors is None:
-            _raise_errors = self._raise_errors
-        p = _strip(locals())
+        # `_api_request` falls back to self._raise_errors when given None.
+        p = _strip(locals(), more=('_raise_errors',))
         return self._api_request('getUpdates', _rectify(p), raise_errors=_raise_errors)
 
     def setWebhook(self,
@@ -1236,7 +1314,7 @@ class Bot(_BotBase):
                    allowed_updates=None,
                    drop_pending_updates=None):
         """ See: https://core.telegram.org/bots/api#setwebhook """
-        p = _strip(locals(), more=['certificate'])
+        p = _strip(locals(), more=('certificate',))
 
         if certificate:
             files = {'certificate': certificate}
@@ -1261,7 +1339,7 @@ class Bot(_BotBase):
 
         :param game_message_identifier: Same as ``msg_identifier`` in :meth:`amanobot.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['game_message_identifier'])
+        p = _strip(locals(), more=('game_message_identifier',))
         p.update(_dismantle_message_identifier(game_message_identifier))
         return self._api_request('setGameScore', _rectify(p))
 
@@ -1271,7 +1349,7 @@ class Bot(_BotBase):
 
         :param game_message_identifier: Same as ``msg_identifier`` in :meth:`amanobot.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['game_message_identifier'])
+        p = _strip(locals(), more=('game_message_identifier',))
         p.update(_dismantle_message_identifier(game_message_identifier))
         return self._api_request('getGameHighScores', _rectify(p))
 
@@ -1282,21 +1360,24 @@ class Bot(_BotBase):
         :param dest: a path or a ``file`` object
         """
         f = self.getFile(file_id)
+        d = r = None
         try:
-            d = dest if _isfile(dest) else open(dest, 'wb')
+            d = dest if isinstance(dest, io.IOBase) else open(dest, 'wb')
 
             r = api.download((self._base_url, self._token, f['file_path']), preload_content=False)
 
-            while 1:
-                data = r.read(self._file_chunk_size)
-                if not data:
-                    break
-                d.write(data)
+            shutil.copyfileobj(r, d, self._file_chunk_size)
+        except:
+            if r is not None:
+                # Body not fully read. Close the connection, so the pool
+                # does not hand it out again with leftover data on it.
+                r.close()
+            raise
         finally:
-            if not _isfile(dest) and 'd' in locals():
+            if d is not None and not isinstance(dest, io.IOBase):
                 d.close()
 
-            if 'r' in locals():
+            if r is not None:
                 r.release_conn()
 
     def message_loop(self, callback=None, relax=0.1,
@@ -1338,7 +1419,7 @@ class Bot(_BotBase):
         When ``source`` is ``None``, these parameters are meaningful:
 
         :type relax: float
-        :param relax: seconds between each ``getUpdates``
+        :param relax: seconds between each ``getUpdates`` that brings no updates or fails
 
         :type timeout: int
         :param timeout:
@@ -1382,37 +1463,39 @@ class Bot(_BotBase):
         elif isinstance(callback, dict):
             callback = flavor_router(callback)
 
-        collect_queue = queue.Queue()
+        # deque's append() and popleft() are thread-safe on their own. The event only
+        # wakes the collector up, which then drains everything queued so far.
+        collect_queue = collections.deque()
+        collect_ready = threading.Event()
+
+        def collect(item):
+            collect_queue.append(item)
+            collect_ready.set()
 
         def collector():
+            popleft = collect_queue.popleft  # looked up once, not once per message
             while 1:
-                try:
-                    item = collect_queue.get(block=True)
-                    callback(item)
-                except:
-                    # Localize error so thread can keep going.
-                    traceback.print_exc()
+                collect_ready.wait()
+                collect_ready.clear()  # before draining, so no item appended meanwhile is missed
+                # Set up exception handling once per drain, not once per message.
+                # After an error, the outer loop resumes draining where it stopped.
+                while collect_queue:
+                    try:
+                        while collect_queue:
+                            callback(popleft())
+                    except:
+                        # Localize error so thread can keep going.
+                        traceback.print_exc()
 
         def relay_to_collector(update):
-            key = _find_first_key(update, ['message',
-                                           'edited_message',
-                                           'channel_post',
-                                           'edited_channel_post',
-                                           'inline_query',
-                                           'chosen_inline_result',
-                                           'callback_query',
-                                           'shipping_query',
-                                           'pre_checkout_query',
-                                           'poll',
-                                           'poll_answer',
-                                           'my_chat_member',
-                                           'chat_member'])
-            collect_queue.put(update[key])
+            key = _find_update_type(update)
+            collect(update[key])
             return update['update_id']
 
         def get_from_telegram_server():
             offset = None  # running offset
             allowed_upd = allowed_updates
+            wait = relax  # grows on consecutive failures, so an error storm does not spin
             while 1:
                 try:
                     result = self.getUpdates(offset=offset,
@@ -1422,30 +1505,36 @@ class Bot(_BotBase):
 
                     # Once passed, this parameter is no longer needed.
                     allowed_upd = None
+                    wait = relax
 
                     if len(result) > 0:
                         # No sort. Trust server to give messages in correct order.
                         # Update offset to max(update_id) + 1
-                        offset = max([relay_to_collector(update) for update in result]) + 1
+                        offset = max(relay_to_collector(update) for update in result) + 1
+
+                        # More updates may be waiting. Ask again without relaxing.
+                        continue
+
+                    time.sleep(relax)
+                    continue
 
                 except exception.BadHTTPResponse as e:
-                    traceback.print_exc()
+                    logging.exception('getUpdates got a bad HTTP response (status %s)', e.status)
 
                     # Servers probably down. Wait longer.
                     if e.status == 502:
-                        time.sleep(30)
-                except:
-                    traceback.print_exc()
-                finally:
-                    time.sleep(relax)
+                        wait = max(wait, 30)
+                except Exception:
+                    logging.exception('getUpdates failed')
+
+                time.sleep(wait)
+                wait = min(max(wait, 1) * 2, 300)  # grows even if `relax` is 0
 
         def dictify(data):
-            if type(data) is bytes:
-                return json.loads(data.decode('utf-8'))
-            if type(data) is str:
-                return json.loads(data)
-            if type(data) is dict:
+            if isinstance(data, dict):  # most common, check first
                 return data
+            if isinstance(data, (str, bytes, bytearray)):
+                return _json_loads(data)  # no need to decode bytes to str first
             raise ValueError()
 
         def get_from_queue_unordered(qu):
@@ -1460,9 +1549,33 @@ class Bot(_BotBase):
         def get_from_queue(qu):
             # Here is the re-ordering mechanism, ensuring in-order delivery of updates.
             max_id = None  # max update_id passed to callback
-            buffer = collections.deque()  # keep those updates which skip some update_id
+            heap = []  # keep those updates which skip some update_id, as (update_id, seq, expiry time, update)
+            seq = itertools.count()  # tie-breaker, so duplicate update_ids never compare the updates
             qwait = None  # how long to wait for updates,
-            # because buffer's content has to be returned in time.
+            # because heap's content has to be returned in time.
+            monotonic = time.monotonic  # unaffected by system clock changes
+
+            def relay_held(max_id):
+                # handle held updates that have become contagious, drop duplicates on the way
+                while heap and heap[0][0] <= max_id + 1:
+                    update_id, _, _, update = heapq.heappop(heap)
+                    if update_id == max_id + 1:
+                        max_id = relay_to_collector(update)
+                return max_id
+
+            def relay_expired(max_id):
+                # A gap has waited as long as the earliest held update above it. So once an
+                # update has been held for `maxhold`, skip every gap below it, handling the
+                # held updates on the way.
+                now = monotonic()
+                top = max((e[0] for e in heap if e[2] <= now), default=None)
+                if top is None:
+                    return max_id
+                while heap and heap[0][0] <= top:
+                    update_id, _, _, update = heapq.heappop(heap)
+                    if update_id > max_id:  # drop duplicates
+                        max_id = relay_to_collector(update)
+                return relay_held(max_id)
 
             while 1:
                 try:
@@ -1477,31 +1590,13 @@ class Bot(_BotBase):
                         # No update_id skipped, handle naturally.
                         max_id = relay_to_collector(update)
 
-                        # clear contagious updates in buffer
-                        if len(buffer) > 0:
-                            buffer.popleft()  # first element belongs to update just received, useless now.
-                            while 1:
-                                try:
-                                    if type(buffer[0]) is dict:
-                                        max_id = relay_to_collector(
-                                            buffer.popleft())  # updates that arrived earlier, handle them.
-                                    else:
-                                        break  # gap, no more contagious updates
-                                except IndexError:
-                                    break  # buffer empty
+                        # updates that arrived earlier, handle them.
+                        if heap:
+                            max_id = relay_held(max_id)
 
                     elif update['update_id'] > max_id + 1:
-                        # Update arrives pre-maturely, insert to buffer.
-                        nbuf = len(buffer)
-                        if update['update_id'] <= max_id + nbuf:
-                            # buffer long enough, put update at position
-                            buffer[update['update_id'] - max_id - 1] = update
-                        else:
-                            # buffer too short, lengthen it
-                            expire = time.time() + maxhold
-                            for a in range(nbuf, update['update_id'] - max_id - 1):
-                                buffer.append(expire)  # put expiry time in gaps
-                            buffer.append(update)
+                        # Update arrives pre-maturely, hold it.
+                        heapq.heappush(heap, (update['update_id'], next(seq), monotonic() + maxhold, update))
 
                     else:
                         pass  # discard
@@ -1510,34 +1605,20 @@ class Bot(_BotBase):
                     # debug message
                     # print('Timeout')
 
-                    # some buffer contents have to be handled
-                    # flush buffer until a non-expired time is encountered
-                    while 1:
-                        try:
-                            if type(buffer[0]) is dict:
-                                max_id = relay_to_collector(buffer.popleft())
-                            else:
-                                expire = buffer[0]
-                                if expire <= time.time():
-                                    max_id += 1
-                                    buffer.popleft()
-                                else:
-                                    break  # non-expired
-                        except IndexError:
-                            break  # buffer empty
+                    # some held updates have to be handled
+                    max_id = relay_expired(max_id)
                 except:
                     traceback.print_exc()
                 finally:
-                    try:
-                        # don't wait longer than next expiry time
-                        qwait = buffer[0] - time.time()
-                        qwait = max(qwait, 0)
-                    except IndexError:
-                        # buffer empty, can wait forever
+                    if heap:
+                        # don't wait longer than the earliest expiry time
+                        qwait = max(min(e[2] for e in heap) - monotonic(), 0)
+                    else:
+                        # heap empty, can wait forever
                         qwait = None
 
                     # debug message
-                    # print ('Buffer:', str(buffer), ', To Wait:', qwait, ', Max ID:', max_id)
+                    # print ('Heap:', str(heap), ', To Wait:', qwait, ', Max ID:', max_id)
 
         collector_thread = threading.Thread(target=collector)
         collector_thread.daemon = True
@@ -1556,11 +1637,11 @@ class Bot(_BotBase):
         message_thread.daemon = True  # need this for main thread to be killable by Ctrl-C
         message_thread.start()
 
-        self._scheduler.on_event(collect_queue.put)
+        self._scheduler.on_event(collect)
         self._scheduler.run_as_thread()
 
         if run_forever:
-            if _isstring(run_forever):
+            if isinstance(run_forever, str):
                 print(run_forever)
             while 1:
                 time.sleep(10)
@@ -1592,14 +1673,18 @@ class DelegatorBot(SpeakerBot):
 
     @staticmethod
     def _startable(delegate):
-        return ((hasattr(delegate, 'start') and inspect.ismethod(delegate.start)) and
-                (hasattr(delegate, 'is_alive') and inspect.ismethod(delegate.is_alive)))
+        return ((hasattr(delegate, 'start') and isinstance(delegate.start, types.MethodType)) and
+                (hasattr(delegate, 'is_alive') and isinstance(delegate.is_alive, types.MethodType)))
 
     @staticmethod
     def _tuple_is_valid(t):
-        return len(t) == 3 and callable(t[0]) and type(t[1]) in [list, tuple] and type(t[2]) is dict
+        return len(t) == 3 and callable(t[0]) and type(t[1]) in (list, tuple) and type(t[2]) is dict
 
     def _ensure_startable(self, delegate):
+        # Delegators in `amanobot.delegate` produce plain functions. A function has no
+        # bound `start` method, so it can go straight to a thread, without the probing below.
+        if isinstance(delegate, types.FunctionType):
+            return threading.Thread(target=delegate)
         if self._startable(delegate):
             return delegate
         if callable(delegate):
@@ -1618,14 +1703,18 @@ class DelegatorBot(SpeakerBot):
 
             if id is None:
                 continue
-            elif isinstance(id, collections.Hashable):
-                if id not in dict or not dict[id].is_alive():
-                    d = make_delegate((self, msg, id))
-                    d = self._ensure_startable(d)
 
-                    dict[id] = d
-                    dict[id].start()
-            else:
+            try:
+                d = dict.get(id)
+            except TypeError:
+                # Unhashable seed: delegates are independent, no seed association is made.
                 d = make_delegate((self, msg, id))
                 d = self._ensure_startable(d)
                 d.start()
+            else:
+                if d is None or not d.is_alive():
+                    d = make_delegate((self, msg, id))
+                    d = self._ensure_startable(d)
+
+                    dict[id] = d
+                    d.start()
@@ -1,22 +1,31 @@
 import asyncio
-import collections
+import heapq
 import io
-import json
+import itertools
+import logging
 import time
 import traceback
+import weakref
 from concurrent.futures._base import CancelledError
 from typing import Union
 
 from . import helper, api
 from .. import (
-    _BotBase, flavor, _find_first_key, _isstring, _strip, _rectify,
+    _BotBase, flavor, _find_update_type, _strip, _rectify, _json_loads,
     _dismantle_message_identifier, _split_input_media_array
 )
 from .. import exception
 
 
+# Routers already made by `flavor_router`, by id() of their routing table. A router holds on
+# to its table, so an id cannot be reused while its entry is alive.
+_flavor_routers = weakref.WeakValueDictionary()
+
+
 def flavor_router(routing_table):
-    router = helper.Router(flavor, routing_table)
+    router = _flavor_routers.get(id(routing_table))
+    if router is None:
+        router = _flavor_routers[id(routing_table)] = helper.Router(flavor, routing_table)
     return router.route
 
 
@@ -78,13 +87,18 @@ class Bot(_BotBase):
                                  raise_errors=raise_errors if raise_errors is not None else self._raise_errors)
 
     async def _api_request_with_file(self, method, params, files, **kwargs):
-        params.update({
-            k: v for k, v in files.items() if _isstring(v)})
-
-        files = {
-            k: v for k, v in files.items() if v is not None and not _isstring(v)}
+        # file_id/URL strings go along with other parameters, file objects get uploaded.
+        uploads = {}
+        for k, v in files.items():
+            if v is None:
+                continue
+            if isinstance(v, str):
+                params[k] = v
+            else:
+                uploads[k] = v
 
-        return await self._api_request(method, _rectify(params), files, **kwargs)
+        # `params` comes rectified from the caller, and file_id/URL strings need no rectifying.
+        return await self._api_request(method, params, uploads, **kwargs)
 
     async def getMe(self):
         """ See: https://core.telegram.org/bots/api#getme """
@@ -145,7 +159,7 @@ class Bot(_BotBase):
             - file-like object: obtained by ``open(path, 'rb')``
             - tuple: (filename, file-like object).
         """
-        p = _strip(locals(), more=['photo'])
+        p = _strip(locals(), more=('photo',))
         return await self._api_request_with_file('sendPhoto', _rectify(p), {'photo': photo})
 
     async def sendAudio(self, chat_id: Union[int, str], audio,
@@ -165,7 +179,7 @@ class Bot(_BotBase):
 
         :param audio: Same as ``photo`` in :meth:`amanobot.aio.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['audio', 'thumb'])
+        p = _strip(locals(), more=('audio', 'thumb'))
         return await self._api_request_with_file('sendAudio', _rectify(p), {'audio': audio, 'thumb': thumb})
 
     async def sendDocument(self, chat_id: Union[int, str], document,
@@ -183,7 +197,7 @@ class Bot(_BotBase):
 
         :param document: Same as ``photo`` in :meth:`amanobot.aio.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['document', 'thumb'])
+        p = _strip(locals(), more=('document', 'thumb'))
         return await self._api_request_with_file('sendDocument', _rectify(p), {'document': document, 'thumb': thumb})
 
     async def sendVideo(self, chat_id: Union[int, str], video,
@@ -204,7 +218,7 @@ class Bot(_BotBase):
 
         :param video: Same as ``photo`` in :meth:`amanobot.aio.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['video', 'thumb'])
+        p = _strip(locals(), more=('video', 'thumb'))
         return await self._api_request_with_file('sendVideo', _rectify(p), {'video': video, 'thumb': thumb})
 
     async def sendAnimation(self, chat_id: Union[int, str], animation,
@@ -224,7 +238,7 @@ class Bot(_BotBase):
 
         :param animation: Same as ``photo`` in :meth:`amanobot.aio.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['animation', 'thumb'])
+        p = _strip(locals(), more=('animation', 'thumb'))
         return await self._api_request_with_file('sendAnimation', _rectify(p), {'animation': animation, 'thumb': thumb})
 
     async def sendVoice(self, chat_id: Union[int, str], voice,
@@ -241,7 +255,7 @@ class Bot(_BotBase):
 
         :param voice: Same as ``photo`` in :meth:`amanobot.aio.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['voice'])
+        p = _strip(locals(), more=('voice',))
         return await self._api_request_with_file('sendVoice', _rectify(p), {'voice': voice})
 
     async def sendVideoNote(self, chat_id: Union[int, str], video_note,
@@ -262,7 +276,7 @@ class Bot(_BotBase):
             it being specified. Supply any integer you want. It seems to have no effect
             on the video note's display size.
         """
-        p = _strip(locals(), more=['video_note', 'thumb'])
+        p = _strip(locals(), more=('video_note', 'thumb'))
         return await self._api_request_with_file('sendVideoNote', _rectify(p), {'video_note': video_note, 'thumb': thumb})
 
     async def sendMediaGroup(self, chat_id: Union[int, str], media,
@@ -288,7 +302,7 @@ class Bot(_BotBase):
             amanobot assigns unique names to each uploaded file. Names assigned by
             amanobot will not collide with user-supplied names, if any.
         """
-        p = _strip(locals(), more=['media'])
+        p = _strip(locals(), more=('media',))
         legal_media, files_to_attach = _split_input_media_array(media)
 
         p['media'] = legal_media
@@ -317,7 +331,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as in :meth:`.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('editMessageLiveLocation', _rectify(p))
 
@@ -328,7 +342,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as in :meth:`.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('stopMessageLiveLocation', _rectify(p))
 
@@ -453,14 +467,14 @@ class Bot(_BotBase):
                                  permissions=None):
         """ See: https://core.telegram.org/bots/api#restrictchatmember """
         if not isinstance(permissions, dict):
-            permissions = dict(can_send_messages=can_send_messages,
-                               can_send_media_messages=can_send_media_messages,
-                               can_send_polls=can_send_polls,
-                               can_send_other_messages=can_send_other_messages,
-                               can_add_web_page_previews=can_add_web_page_previews,
-                               can_change_info=can_change_info,
-                               can_invite_users=can_invite_users,
-                               can_pin_messages=can_pin_messages)
+            permissions = {'can_send_messages': can_send_messages,
+                           'can_send_media_messages': can_send_media_messages,
+                           'can_send_polls': can_send_polls,
+                           'can_send_other_messages': can_send_other_messages,
+                           'can_add_web_page_previews': can_add_web_page_previews,
+                           'can_change_info': can_change_info,
+                           'can_invite_users': can_invite_users,
+                           'can_pin_messages': can_pin_messages}
         p = _strip(locals())
         return await self._api_request('restrictChatMember', _rectify(p))
 
@@ -498,14 +512,14 @@ class Bot(_BotBase):
                                  permissions=None):
         """ See: https://core.telegram.org/bots/api#setchatpermissions """
         if not isinstance(permissions, dict):
-            permissions = dict(can_send_messages=can_send_messages,
-                               can_send_media_messages=can_send_media_messages,
-                               can_send_polls=can_send_polls,
-                               can_send_other_messages=can_send_other_messages,
-                               can_add_web_page_previews=can_add_web_page_previews,
-                               can_change_info=can_change_info,
-                               can_invite_users=can_invite_users,
-                               can_pin_messages=can_pin_messages)
+            permissions = {'can_send_messages': can_send_messages,
+                           'can_send_media_messages': can_send_media_messages,
+                           'can_send_polls': can_send_polls,
+                           'can_send_other_messages': can_send_other_messages,
+                           'can_add_web_page_previews': can_add_web_page_previews,
+                           'can_change_info': can_change_info,
+                           'can_invite_users': can_invite_users,
+                           'can_pin_messages': can_pin_messages}
         p = _strip(locals())
         return await self._api_request('setChatPermissions', _rectify(p))
 
@@ -536,7 +550,7 @@ class Bot(_BotBase):
 
     async def setChatPhoto(self, chat_id: Union[int, str], photo):
         """ See: https://core.telegram.org/bots/api#setchatphoto """
-        p = _strip(locals(), more=['photo'])
+        p = _strip(locals(), more=('photo',))
         return await self._api_request_with_file('setChatPhoto', _rectify(p), {'photo': photo})
 
     async def deleteChatPhoto(self, chat_id):
@@ -659,7 +673,7 @@ class Bot(_BotBase):
             or simply ``inline_message_id``.
             You may extract this value easily with :meth:`amanobot.message_identifier`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('editMessageText', _rectify(p))
 
@@ -673,7 +687,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as ``msg_identifier`` in :meth:`amanobot.aio.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('editMessageCaption', _rectify(p))
 
@@ -684,7 +698,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as ``msg_identifier`` in :meth:`amanobot.aio.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('editMessageMedia', _rectify(p))
 
@@ -695,7 +709,7 @@ class Bot(_BotBase):
 
         :param msg_identifier: Same as ``msg_identifier`` in :meth:`amanobot.aio.Bot.editMessageText`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('editMessageReplyMarkup', _rectify(p))
 
@@ -708,7 +722,7 @@ class Bot(_BotBase):
             a 2-tuple (``chat_id``, ``message_id``).
             You may extract this value easily with :meth:`amanobot.message_identifier`
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('stopPoll', _rectify(p))
 
@@ -720,7 +734,7 @@ class Bot(_BotBase):
             Same as ``msg_identifier`` in :meth:`amanobot.aio.Bot.editMessageText`,
             except this method does not work on inline messages.
         """
-        p = _strip(locals(), more=['msg_identifier'])
+        p = _strip(locals(), more=('msg_identifier',))
         p.update(_dismantle_message_identifier(msg_identifier))
         return await self._api_request('deleteMessage', _rectify(p))
 
@@ -734,7 +748,7 @@ class Bot(_BotBase):
 
         :param sticker: Same as ``photo`` in :meth:`amanobot.aio.Bot.sendPhoto`
         """
-        p = _strip(locals(), more=['sticker'])
+        p = _strip(locals(), more=('sticker',))
         return await self._api_request_with_file('sendSticker', _rectify(p), {'sticker': sticker})
 
     async def getStickerSet(self, name):
@@ -748,7 +762,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#uploadstickerfile
         """
-        p = _strip(locals(), more=['png_sticker'])
+        p = _strip(locals(), more=('png_sticker',))
         return await self._api_request_with_file('uploadStickerFile', _rectify(p), {'png_sticker': png_sticker})
 
     async def createNewStickerSet(self, user_id, name, title, emojis,
@@ -759,7 +773,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#createnewstickerset
         """
-        p = _strip(locals(), more=['png_sticker', 'tgs_sticker'])
+        p = _strip(locals(), more=('png_sticker', 'tgs_sticker'))
         return await self._api_request_with_file('createNewStickerSet', _rectify(p), {'png_sticker': png_sticker, 'tgs_sticker': tgs_sticker})
 
     async def addStickerToSet(self, user_id, name, emojis,
@@ -769,7 +783,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#addstickertoset
         """
-        p = _strip(locals(), more=['png_sticker', 'tgs_sticker'])
+        p = _strip(locals(), more=('png_sticker', 'tgs_sticker'))
         return await self._api_request_with_file('addStickerToSet', _rectify(p), {'png_sticker': png_sticker, 'tgs_sticker': tgs_sticker})
 
     async def setStickerPositionInSet(self, sticker, position):
@@ -791,7 +805,7 @@ class Bot(_BotBase):
         """
         See: https://core.telegram.org/bots/api#setstickersetthumb
         """
-        p = _strip(locals(), more=['thumb'])
+        p = _strip(locals(), more=('thumb',))
         return await self._api_request_with_file('setStickerSetThumb', _rectify(p), {'thumb': thumb})
 
     async def answerInlineQuery(self, inline_query_id, results,
@@ -811,9 +825,8 @@ class Bot(_BotBase):
                          allowed_updates=None,
                          _raise_errors=None):
         """ See: https://core.telegram.org/bots/api#getupdates """
-        if _raise_errors is None:
-            _raise_errors = self._raise_errors
-        p = _strip(locals())
+        # `_api_request` falls back to self._raise_errors when given None.
+        p = _strip(locals(), more=('_raise_errors',))
         return await self._api_request('getUpdates', _rectify(p), raise_errors=_raise_errors)
 
     async def setWebhook(self,
@@ -824,7 +837,7 @@ class Bot(_BotBase):
                          allowed_updates=None,
                          drop_pending_updates=None):
         """ See: https://core.telegram.org/bots/api#setwebhook """
-        p = _strip(locals(), more=['certificate'])
+        p = _strip(locals(), more=('certificate',))
 
         if certificate:
             files = {'certificate': certificate}
@@ -845,13 +858,13 @@ class Bot(_BotBase):
                            force=None,
                            disable_edit_message=None):
         """ See: https://core.telegram.org/bots/api#setgamescore """
-        p = _strip(locals(), more=['game_message_identifier'])
+        p = _strip(locals(), more=('game_message_identifier',))
         p.update(_dismantle_message_identifier(game_message_identifier))
         return await self._api_request('setGameScore', _rectify(p))
 
     async def getGameHighScores(self, user_id, game_message_identifier):
         """ See: https://core.telegram.org/bots/api#getgamehighscores """
-        p = _strip(locals(), more=['game_message_identifier'])
+        p = _strip(locals(), more=('game_message_identifier',))
         p.update(_dismantle_message_identifier(game_message_identifier))
         return await self._api_request('getGameHighScores', _rectify(p))
 
@@ -863,6 +876,7 @@ class Bot(_BotBase):
         """
         f = await self.getFile(file_id)
 
+        d = None
         try:
             d = dest if isinstance(dest, io.IOBase) else open(dest, 'wb')
 
@@ -877,7 +891,7 @@ class Bot(_BotBase):
                         d.write(chunk)
                         d.flush()
         finally:
-            if not isinstance(dest, io.IOBase) and 'd' in locals():
+            if d is not None and not isinstance(dest, io.IOBase):
                 d.close()
 
     async def message_loop(self, handler=None, relax=0.1,
@@ -898,7 +912,7 @@ class Bot(_BotBase):
         one argument (the message).
 
         :param relax:
-            seconds between each ``getUpdates``
+            seconds between each ``getUpdates`` that brings no updates or fails
 
         :type timeout: int
         :param timeout:
@@ -957,19 +971,7 @@ class Bot(_BotBase):
 
         def handle(update):
             try:
-                key = _find_first_key(update, ['message',
-                                               'edited_message',
-                                               'channel_post',
-                                               'edited_channel_post',
-                                               'inline_query',
-                                               'chosen_inline_result',
-                                               'callback_query',
-                                               'shipping_query',
-                                               'pre_checkout_query',
-                                               'poll',
-                                               'poll_answer',
-                                               'my_chat_member',
-                                               'chat_member'])
+                key = _find_update_type(update)
 
                 callback(update[key])
             except:
@@ -981,6 +983,7 @@ class Bot(_BotBase):
         async def get_from_telegram_server():
             offset = None  # running offset
             allowed_upd = allowed_updates
+            wait = relax  # grows on consecutive failures, so an error storm does not spin
             while 1:
                 try:
                     result = await self.getUpdates(offset=offset,
@@ -990,32 +993,36 @@ class Bot(_BotBase):
 
                     # Once passed, this parameter is no longer needed.
                     allowed_upd = None
+                    wait = relax
 
                     if len(result) > 0:
                         # No sort. Trust server to give messages in correct order.
                         # Update offset to max(update_id) + 1
-                        offset = max([handle(update) for update in result]) + 1
+                        offset = max(handle(update) for update in result) + 1
                 except CancelledError:
                     raise
                 except exception.BadHTTPResponse as e:
-                    traceback.print_exc()
+                    logging.exception('getUpdates got a bad HTTP response (status %s)', e.status)
 
                     # Servers probably down. Wait longer.
                     if e.status == 502:
-                        await asyncio.sleep(30)
-                except:
-                    traceback.print_exc()
-                    await asyncio.sleep(relax)
+                        wait = max(wait, 30)
+                except Exception:
+                    logging.exception('getUpdates failed')
                 else:
-                    await asyncio.sleep(relax)
+                    # More updates may be waiting. Ask again without relaxing.
+                    if not result:
+                        await asyncio.sleep(relax)
+                    continue
+
+                await asyncio.sleep(wait)
+                wait = min(max(wait, 1) * 2, 300)  # grows even if `relax` is 0
 
         def dictify(data):
-            if type(data) is bytes:
-                return json.loads(data.decode('utf-8'))
-            if type(data) is str:
-                return json.loads(data)
-            if type(data) is dict:
+            if isinstance(data, dict):  # most common, check first
                 return data
+            if isinstance(data, (str, bytes, bytearray)):
+                return _json_loads(data)  # no need to decode bytes to str first
             raise ValueError()
 
         async def get_from_queue_unordered(qu):
@@ -1030,9 +1037,34 @@ class Bot(_BotBase):
         async def get_from_queue(qu):
             # Here is the re-ordering mechanism, ensuring in-order delivery of updates.
             max_id = None                 # max update_id passed to callback
-            buffer = collections.deque()  # keep those updates which skip some update_id
+            heap = []                     # keep those updates which skip some update_id,
+                                          # as (update_id, seq, expiry time, update)
+            seq = itertools.count()       # tie-breaker, so duplicate update_ids never compare the updates
             qwait = None                  # how long to wait for updates,
-                                          # because buffer's content has to be returned in time.
+                                          # because heap's content has to be returned in time.
+            monotonic = time.monotonic    # unaffected by system clock changes
+
+            def handle_held(max_id):
+                # handle held updates that have become contagious, drop duplicates on the way
+                while heap and heap[0][0] <= max_id + 1:
+                    update_id, _, _, update = heapq.heappop(heap)
+                    if update_id == max_id + 1:
+                        max_id = handle(update)
+                return max_id
+
+            def handle_expired(max_id):
+                # A gap has waited as long as the earliest held update above it. So once an
+                # update has been held for `maxhold`, skip every gap below it, handling the
+                # held updates on the way.
+                now = monotonic()
+                top = max((e[0] for e in heap if e[2] <= now), default=None)
+                if top is None:
+                    return max_id
+                while heap and heap[0][0] <= top:
+                    update_id, _, _, update = heapq.heappop(heap)
+                    if update_id > max_id:  # drop duplicates
+                        max_id = handle(update)
+                return handle_held(max_id)
 
             while 1:
                 try:
@@ -1047,30 +1079,13 @@ class Bot(_BotBase):
                         # No update_id skipped, handle naturally.
                         max_id = handle(update)
 
-                        # clear contagious updates in buffer
-                        if len(buffer) > 0:
-                            buffer.popleft()  # first element belongs to update just received, useless now.
-                            while 1:
-                                try:
-                                    if type(buffer[0]) is dict:
-                                        max_id = handle(buffer.popleft())  # updates that arrived earlier, handle them.
-                                    else:
-                                        break  # gap, no more contagious updates
-                                except IndexError:
-                                    break  # buffer empty
+                        # updates that arrived earlier, handle them.
+                        if heap:
+                            max_id = handle_held(max_id)
 
                     elif update['update_id'] > max_id + 1:
-                        # Update arrives pre-maturely, insert to buffer.
-                        nbuf = len(buffer)
-                        if update['update_id'] <= max_id + nbuf:
-                            # buffer long enough, put update at position
-                            buffer[update['update_id'] - max_id - 1] = update
-                        else:
-                            # buffer too short, lengthen it
-                            expire = time.time() + maxhold
-                            for a in range(nbuf, update['update_id']-max_id-1):
-                                buffer.append(expire)  # put expiry time in gaps
-                            buffer.append(update)
+                        # Update arrives pre-maturely, hold it.
+                        heapq.heappush(heap, (update['update_id'], next(seq), monotonic() + maxhold, update))
 
                     else:
                         pass  # discard
@@ -1079,34 +1094,20 @@ class Bot(_BotBase):
                     # debug message
                     # print('Timeout')
 
-                    # some buffer contents have to be handled
-                    # flush buffer until a non-expired time is encountered
-                    while 1:
-                        try:
-                            if type(buffer[0]) is dict:
-                                max_id = handle(buffer.popleft())
-                            else:
-                                expire = buffer[0]
-                                if expire <= time.time():
-                                    max_id += 1
-                                    buffer.popleft()
-                                else:
-                                    break  # non-expired
-                        except IndexError:
-                            break  # buffer empty
+                    # some held updates have to be handled
+                    max_id = handle_expired(max_id)
                 except:
                     traceback.print_exc()
                 finally:
-                    try:
-                        # don't wait longer than next expiry time
-                        qwait = buffer[0] - time.time()
-                        qwait = max(qwait, 0)
-                    except IndexError:
-                        # buffer empty, can wait forever
+                    if heap:
+                        # don't wait longer than the earliest expiry time
+                        qwait = max(min(e[2] for e in heap) - monotonic(), 0)
+                    else:
+                        # heap empty, can wait forever
                         qwait = None
 
                     # debug message
-                    # print ('Buffer:', str(buffer), ', To Wait:', qwait, ', Max ID:', max_id)
+                    # print ('Heap:', str(heap), ', To Wait:', qwait, ', Max ID:', max_id)
 
         self._scheduler._callback = callback
 
@@ -1153,14 +1154,18 @@ class DelegatorBot(SpeakerBot):
 
             if id is None:
                 continue
-            if isinstance(id, collections.Hashable):
-                if id not in dict or dict[id].done():
+
+            try:
+                task = dict.get(id)
+            except TypeError:
+                # Unhashable seed: delegates are independent, no seed association is made.
+                c = make_coroutine_obj((self, msg, id))
+                self._loop.create_task(c)
+            else:
+                if task is None or task.done():
                     c = make_coroutine_obj((self, msg, id))
 
                     if not asyncio.iscoroutine(c):
                         raise RuntimeError('You must produce a coroutine *object* as delegate.')
 
                     dict[id] = self._loop.create_task(c)
-            else:
-                c = make_coroutine_obj((self, msg, id))
-                self._loop.create_task(c)
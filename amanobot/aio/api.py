@@ -1,128 +1,158 @@
 import asyncio
 import atexit
-import json
-import re
+import urllib.parse
 
 import aiohttp
+import aiohttp.payload
 import async_timeout
 
-from .. import exception
-from ..api import _methodurl, _which_pool, _fileurl, _guess_filename
+from .. import exception, _json_loads
+from ..api import _methodurl, _fileurl, _guess_filename, _find_error_class
 
-_loop = asyncio.get_event_loop()
-
-_pools = {
-    'default': aiohttp.ClientSession(
-                   connector=aiohttp.TCPConnector(limit=10),
-                   loop=_loop)
+# Uploads reuse a session too, but one of their own, so that long transfers
+# do not tie up connections of the default session. It has no connection limit:
+# uploads have no timeout, so any cap would make extra uploads wait indefinitely.
+_pool_limits = {
+    'default': 10,
+    'upload': 0,  # unlimited
 }
 
+# Sessions are made on first use, on the loop actually running the requests,
+# so that importing this module does not touch any event loop.
+_pools = {}
+_pools_loop = None
+_pools_closer = None  # task closing `_pools` before `_pools_loop` shuts down
+
 _timeout = 30
 _proxy = None  # (url, (username, password))
+_proxy_request_kwargs = {}  # built from `_proxy` by `set_proxy`, not on every request
 
 
 def set_proxy(url, basic_auth=None):
-    global _proxy
+    global _proxy, _proxy_request_kwargs
     if not url:
         _proxy = None
+        _proxy_request_kwargs = {}
+    elif basic_auth:
+        _proxy = (url, basic_auth)
+        _proxy_request_kwargs = {'proxy': url, 'proxy_auth': aiohttp.BasicAuth(*basic_auth)}
     else:
-        _proxy = (url, basic_auth) if basic_auth else (url,)
+        _proxy = (url,)
+        _proxy_request_kwargs = {'proxy': url}
 
 
 def _proxy_kwargs():
-    if _proxy is None or len(_proxy) == 0:
-        return {}
-    if len(_proxy) == 1:
-        return {'proxy': _proxy[0]}
-    if len(_proxy) == 2:
-        return {'proxy': _proxy[0], 'proxy_auth': aiohttp.BasicAuth(*_proxy[1])}
-    raise RuntimeError("_proxy has invalid length")
+    return _proxy_request_kwargs
+
+
+def _get_pool(name):
+    global _pools, _pools_loop, _pools_closer
+    loop = asyncio.get_event_loop()  # the running loop, as this is called from coroutines
+    if loop is not _pools_loop:
+        # Sessions are bound to the loop they were made on, e.g. by an earlier
+        # asyncio.run(). Start afresh on this loop.
+        if _pools_closer is not None:
+            _pools_closer.cancel()  # closes the old sessions, if their loop still runs
+        _pools = {}
+        _pools_loop = loop
+        _pools_closer = loop.create_task(_close_at_shutdown(_pools))
+
+    session = _pools.get(name)
+    if session is None or session.closed:
+        session = _pools[name] = aiohttp.ClientSession(
+                                     connector=aiohttp.TCPConnector(limit=_pool_limits[name]))
+    return session
+
+
+async def _close_at_shutdown(pools):
+    # asyncio.run() cancels leftover tasks before closing its loop. Waiting for that
+    # lets the sessions be closed on their own loop, while it still runs.
+    try:
+        await asyncio.get_event_loop().create_future()
+    finally:
+        for s in pools.values():
+            await s.close()
 
 
-async def _close_pools():
-    global _pools
-    for s in _pools.values():
-        await s.close()
+def _close_pools_at_exit():
+    # The loop was left without being shut down, e.g. stopped by Ctrl-C in run_forever().
+    if _pools_closer is None or _pools_closer.done() or _pools_loop.is_closed():
+        return
+    _pools_closer.cancel()
+    if not _pools_loop.is_running():
+        _pools_loop.run_until_complete(asyncio.wait([_pools_closer]))
 
-atexit.register(lambda: _loop.create_task(_close_pools()))  # have to wrap async function
+atexit.register(_close_pools_at_exit)
 
 
 def _create_onetime_pool():
     return aiohttp.ClientSession(
-               connector=aiohttp.TCPConnector(limit=1, force_close=True),
-               loop=_loop)
+               connector=aiohttp.TCPConnector(limit=1, force_close=True))
 
 
-def _default_timeout(req, **user_kw):
-    return _timeout
-
-
-def _compose_timeout(req, **user_kw):
-    base_url, token, method, params, files = req
-
+def _compose_timeout(method, params, files):
     if method == 'getUpdates' and params and 'timeout' in params:
         # Ensure HTTP timeout is longer than getUpdates timeout
-        return params['timeout'] + _default_timeout(req, **user_kw)
+        return params['timeout'] + _timeout
     if files:
         # Disable timeout if uploading files. For some reason, the larger the file,
         # the longer it takes for the server to respond (after upload is finished).
         # It is unclear how long timeout should be.
         return None
-    return _default_timeout(req, **user_kw)
+    return _timeout
 
 
-def _compose_data(req, **user_kw):
-    base_url, token, method, params, files = req
+def _compose_data(params, files):
+    if not files:
+        # Encode the form directly, the way FormData would, without its per-field bookkeeping.
+        return aiohttp.payload.BytesPayload(urllib.parse.urlencode(params or {}).encode(),
+                                            content_type='application/x-www-form-urlencoded')
 
     data = aiohttp.FormData()
+    add_field = data.add_field
 
     if params:
+        # Rectified params are mostly strings already; only numbers need converting.
         for key,value in params.items():
-            data.add_field(key, str(value))
+            add_field(key, value if type(value) is str else str(value))
 
-    if files:
-        for key,f in files.items():
-            if isinstance(f, tuple):
-                if len(f) == 2:
-                    filename, fileobj = f
-                else:
-                    raise ValueError('Tuple must have exactly 2 elements: filename, fileobj')
+    for key,f in files.items():
+        if isinstance(f, tuple):
+            if len(f) == 2:
+                filename, fileobj = f
             else:
-                filename, fileobj = _guess_filename(f) or key, f
+                raise ValueError('Tuple must have exactly 2 elements: filename, fileobj')
+        else:
+            filename, fileobj = _guess_filename(f) or key, f
 
-            data.add_field(key, fileobj, filename=filename)
+        add_field(key, fileobj, filename=filename)
 
     return data
 
 
 def _transform(req, **user_kw):
-    timeout = _compose_timeout(req, **user_kw)
+    base_url, token, method, params, files = req  # helpers take the pieces, not `req`
 
-    data = _compose_data(req, **user_kw)
+    timeout = _compose_timeout(method, params, files)
 
-    url = _methodurl(req, **user_kw)
+    data = _compose_data(params, files)
 
-    name = _which_pool(req, **user_kw)
+    url = _methodurl(req)
 
-    if name is None:
-        session = _create_onetime_pool()
-        cleanup = session.close  # one-time session: remember to close
-    else:
-        session = _pools[name]
-        cleanup = None  # reuse: do not close
+    session = _get_pool('upload' if files else 'default')
 
     kwargs = {'data':data}
     kwargs.update(user_kw)
 
-    return session.post, (url,), kwargs, timeout, cleanup
+    return session.post, (url,), kwargs, timeout
 
 
 async def _parse(response, raise_errors):
     try:
-        data = await response.json()
+        data = _json_loads(await response.read())
         if data is None:
             raise ValueError()
-    except (ValueError, json.JSONDecodeError, aiohttp.ClientResponseError):
+    except (ValueError, aiohttp.ClientResponseError):  # JSONDecodeError is a ValueError
         text = await response.text()
         raise exception.BadHTTPResponse(response.status, text, response)
 
@@ -131,19 +161,11 @@ async def _parse(response, raise_errors):
     if not raise_errors:
         return data
     description, error_code = data['description'], data['error_code']
-
-    # Look for specific error ...
-    for e in exception.TelegramError.__subclasses__():
-        n = len(e.DESCRIPTION_PATTERNS)
-        if any(map(re.search, e.DESCRIPTION_PATTERNS, n*[description], n*[re.IGNORECASE])):
-            raise e(description, error_code, data)
-
-            # ... or raise generic error
-    raise exception.TelegramError(description, error_code, data)
+    raise _find_error_class(description)(description, error_code, data)
 
 
 async def request(req, raise_errors, **user_kw):
-    fn, args, kwargs, timeout, cleanup = _transform(req, **user_kw)
+    fn, args, kwargs, timeout = _transform(req, **user_kw)
 
     kwargs.update(_proxy_kwargs())
     try:
@@ -162,13 +184,6 @@ async def request(req, raise_errors, **user_kw):
     except aiohttp.ClientConnectionError:
         raise exception.TelegramError('Connection Error', 400, {})
 
-    finally:
-        if cleanup:  # e.g. closing one-time session
-            if asyncio.iscoroutinefunction(cleanup):
-                await cleanup()
-            else:
-                cleanup()
-
 
 def download(req):
     session = _create_onetime_pool()
@@ -224,10 +224,14 @@ class Router(helper.Router):
         """
         k = self.key_function(msg)
 
+        # Unpack only the form returned, rather than building all three forms every time.
         if isinstance(k, (tuple, list)):
-            key, args, kwargs = {1: tuple(k) + ((),{}),
-                                 2: tuple(k) + ({},),
-                                 3: tuple(k),}[len(k)]
+            if len(k) == 1:
+                key, args, kwargs = k[0], (), {}
+            elif len(k) == 2:
+                (key, args), kwargs = k, {}
+            else:
+                key, args, kwargs = k
         else:
             key, args, kwargs = k, (), {}
 
@@ -1,5 +1,7 @@
 import asyncio
-import collections
+import heapq
+import itertools
+import logging
 import time
 import traceback
 from concurrent.futures._base import CancelledError
@@ -23,6 +25,7 @@ class GetUpdatesLoop():
         :param timeout: int
         :param allowed_updates: bool
         """
+        wait = relax  # grows on consecutive failures, so an error storm does not spin
         while 1:
             try:
                 result = await self._bot.getUpdates(offset=offset,
@@ -32,6 +35,7 @@ class GetUpdatesLoop():
 
                 # Once passed, this parameter is no longer needed.
                 allowed_updates = None
+                wait = relax
 
                 # No sort. Trust server to give messages in correct order.
                 for update in result:
@@ -41,16 +45,21 @@ class GetUpdatesLoop():
             except CancelledError:
                 break
             except exception.BadHTTPResponse as e:
-                traceback.print_exc()
+                logging.exception('getUpdates got a bad HTTP response (status %s)', e.status)
 
                 # Servers probably down. Wait longer.
                 if e.status == 502:
-                    await asyncio.sleep(30)
-            except:
-                traceback.print_exc()
-                await asyncio.sleep(relax)
+                    wait = max(wait, 30)
+            except Exception:
+                logging.exception('getUpdates failed')
             else:
-                await asyncio.sleep(relax)
+                # More updates may be waiting. Ask again without relaxing.
+                if not result:
+                    await asyncio.sleep(relax)
+                continue
+
+            await asyncio.sleep(wait)
+            wait = min(max(wait, 1) * 2, 300)  # grows even if `relax` is 0
 
 
 def _infer_handler_function(bot, h):
@@ -121,9 +130,34 @@ class OrderedWebhook():
 
         # Here is the re-ordering mechanism, ensuring in-order delivery of updates.
         max_id = None                 # max update_id passed to callback
-        buffer = collections.deque()  # keep those updates which skip some update_id
+        heap = []                     # keep those updates which skip some update_id,
+                                      # as (update_id, seq, expiry time, update)
+        seq = itertools.count()       # tie-breaker, so duplicate update_ids never compare the updates
         qwait = None                  # how long to wait for updates,
-                                      # because buffer's content has to be returned in time.
+                                      # because heap's content has to be returned in time.
+        monotonic = time.monotonic    # unaffected by system clock changes
+
+        def handle_held(max_id):
+            # handle held updates that have become contagious, drop duplicates on the way
+            while heap and heap[0][0] <= max_id + 1:
+                update_id, _, _, update = heapq.heappop(heap)
+                if update_id == max_id + 1:
+                    max_id = extract_handle(update)
+            return max_id
+
+        def handle_expired(max_id):
+            # A gap has waited as long as the earliest held update above it. So once an
+            # update has been held for `maxhold`, skip every gap below it, handling the
+            # held updates on the way.
+            now = monotonic()
+            top = max((e[0] for e in heap if e[2] <= now), default=None)
+            if top is None:
+                return max_id
+            while heap and heap[0][0] <= top:
+                update_id, _, _, update = heapq.heappop(heap)
+                if update_id > max_id:  # drop duplicates
+                    max_id = extract_handle(update)
+            return handle_held(max_id)
 
         while 1:
             try:
@@ -137,30 +171,13 @@ class OrderedWebhook():
                     # No update_id skipped, handle naturally.
                     max_id = extract_handle(update)
 
-                    # clear contagious updates in buffer
-                    if len(buffer) > 0:
-                        buffer.popleft()  # first element belongs to update just received, useless now.
-                        while 1:
-                            try:
-                                if type(buffer[0]) is dict:
-                                    max_id = extract_handle(buffer.popleft())  # updates that arrived earlier, handle them.
-                                else:
-                                    break  # gap, no more contagious updates
-                            except IndexError:
-                                break  # buffer empty
+                    # updates that arrived earlier, handle them.
+                    if heap:
+                        max_id = handle_held(max_id)
 
                 elif update['update_id'] > max_id + 1:
-                    # Update arrives pre-maturely, insert to buffer.
-                    nbuf = len(buffer)
-                    if update['update_id'] <= max_id + nbuf:
-                        # buffer long enough, put update at position
-                        buffer[update['update_id'] - max_id - 1] = update
-                    else:
-                        # buffer too short, lengthen it
-                        expire = time.time() + maxhold
-                        for a in range(nbuf, update['update_id']-max_id-1):
-                            buffer.append(expire)  # put expiry time in gaps
-                        buffer.append(update)
+                    # Update arrives pre-maturely, hold it.
+                    heapq.heappush(heap, (update['update_id'], next(seq), monotonic() + maxhold, update))
 
                 else:
                     pass  # discard
@@ -169,34 +186,20 @@ class OrderedWebhook():
                 # debug message
                 # print('Timeout')
 
-                # some buffer contents have to be handled
-                # flush buffer until a non-expired time is encountered
-                while 1:
-                    try:
-                        if type(buffer[0]) is dict:
-                            max_id = extract_handle(buffer.popleft())
-                        else:
-                            expire = buffer[0]
-                            if expire <= time.time():
-                                max_id += 1
-                                buffer.popleft()
-                            else:
-                                break  # non-expired
-                    except IndexError:
-                        break  # buffer empty
+                # some held updates have to be handled
+                max_id = handle_expired(max_id)
             except:
                 traceback.print_exc()
             finally:
-                try:
-                    # don't wait longer than next expiry time
-                    qwait = buffer[0] - time.time()
-                    qwait = max(qwait, 0)
-                except IndexError:
-                    # buffer empty, can wait forever
+                if heap:
+                    # don't wait longer than the earliest expiry time
+                    qwait = max(min(e[2] for e in heap) - monotonic(), 0)
+                else:
+                    # heap empty, can wait forever
                     qwait = None
 
                 # debug message
-                # print ('Buffer:', str(buffer), ', To Wait:', qwait, ', Max ID:', max_id)
+                # print ('Heap:', str(heap), ', To Wait:', qwait, ', Max ID:', max_id)
 
     def feed(self, data):
         update = _dictify(data)
@@ -4,21 +4,25 @@ import re
 
 import urllib3
 
-from . import exception, _isstring
+from . import exception
 
 # Suppress InsecurePlatformWarning
 urllib3.disable_warnings()
 
 
-_default_pool_params = dict(num_pools=3, maxsize=10, retries=3, timeout=30)
-_onetime_pool_params = dict(num_pools=1, maxsize=1, retries=3, timeout=30)
+# All bots share these pools, so bursts of calls from many handler threads reuse
+# kept-alive connections. Beyond `maxsize`, extra connections are opened and then
+# discarded, so it is sized generously.
+_default_pool_params = dict(num_pools=3, maxsize=32, retries=3, timeout=30)
+_upload_pool_params = dict(num_pools=1, maxsize=4, retries=3, timeout=30)
 
+# Uploads and downloads keep their connections alive too, but in a pool of their own,
+# so that long transfers do not tie up connections of the default pool.
 _pools = {
     'default': urllib3.PoolManager(**_default_pool_params),
+    'upload': urllib3.PoolManager(**_upload_pool_params),
 }
 
-_onetime_pool_spec = (urllib3.PoolManager, _onetime_pool_params)
-
 
 def set_proxy(url, basic_auth=None):
     """
@@ -27,22 +31,17 @@ def set_proxy(url, basic_auth=None):
     :param url: proxy URL
     :param basic_auth: 2-tuple ``('username', 'password')``
     """
-    global _pools, _onetime_pool_spec
+    global _pools
     if not url:
         _pools['default'] = urllib3.PoolManager(**_default_pool_params)
-        _onetime_pool_spec = (urllib3.PoolManager, _onetime_pool_params)
+        _pools['upload'] = urllib3.PoolManager(**_upload_pool_params)
     elif basic_auth:
         h = urllib3.make_headers(proxy_basic_auth=':'.join(basic_auth))
         _pools['default'] = urllib3.ProxyManager(url, proxy_headers=h, **_default_pool_params)
-        _onetime_pool_spec = (urllib3.ProxyManager, dict(proxy_url=url, proxy_headers=h, **_onetime_pool_params))
+        _pools['upload'] = urllib3.ProxyManager(url, proxy_headers=h, **_upload_pool_params)
     else:
         _pools['default'] = urllib3.ProxyManager(url, **_default_pool_params)
-        _onetime_pool_spec = (urllib3.ProxyManager, dict(proxy_url=url, **_onetime_pool_params))
-
-
-def _create_onetime_pool():
-    cls, kw = _onetime_pool_spec
-    return cls(**kw)
+        _pools['upload'] = urllib3.ProxyManager(url, **_upload_pool_params)
 
 
 def _methodurl(req, **user_kw):
@@ -57,7 +56,7 @@ def _which_pool(req, **user_kw):
 
 def _guess_filename(obj):
     name = getattr(obj, 'name', None)
-    if name and _isstring(name) and name[0] != '<' and name[-1] != '>':
+    if name and isinstance(name, str) and name[0] != '<' and name[-1] != '>':
         return os.path.basename(name)
 
 
@@ -91,9 +90,7 @@ def _compose_fields(req, **user_kw):
 
 def _default_timeout(req, **user_kw):
     name = _which_pool(req, **user_kw)
-    if name is None:
-        return _onetime_pool_spec[1]['timeout']
-    return _pools[name].connection_pool_kw['timeout']
+    return _pools[name or 'upload'].connection_pool_kw['timeout']
 
 
 def _compose_kwargs(req, **user_kw):
@@ -126,14 +123,33 @@ def _transform(req, **user_kw):
 
     name = _which_pool(req, **user_kw)
 
-    if name is None:
-        pool = _create_onetime_pool()
-    else:
-        pool = _pools[name]
+    pool = _pools[name or 'upload']
 
     return pool.request_encode_body, ('POST', url, fields), kwargs
 
 
+# TelegramError subclasses with their compiled DESCRIPTION_PATTERNS, rebuilt only
+# when a subclass is added, e.g. a custom error defined by the user.
+_error_patterns = ((), [])
+
+
+def _find_error_class(description):
+    global _error_patterns
+    subclasses = tuple(exception.TelegramError.__subclasses__())
+    if subclasses != _error_patterns[0]:
+        _error_patterns = (subclasses,
+                           [(e, [re.compile(p, re.IGNORECASE) for p in e.DESCRIPTION_PATTERNS])
+                            for e in subclasses])
+
+    # Look for specific error ...
+    for e, patterns in _error_patterns[1]:
+        if any(p.search(description) for p in patterns):
+            return e
+
+    # ... or fall back to generic error
+    return exception.TelegramError
+
+
 def _parse(response, raise_errors):
     try:
         text = response.data.decode('utf-8')
@@ -146,15 +162,7 @@ def _parse(response, raise_errors):
     if not raise_errors:
         return data
     description, error_code = data['description'], data['error_code']
-
-    # Look for specific error ...
-    for e in exception.TelegramError.__subclasses__():
-        n = len(e.DESCRIPTION_PATTERNS)
-        if any(map(re.search, e.DESCRIPTION_PATTERNS, n*[description], n*[re.IGNORECASE])):
-            raise e(description, error_code, data)
-
-            # ... or raise generic error
-    raise exception.TelegramError(description, error_code, data)
+    raise _find_error_class(description)(description, error_code, data)
 
 
 def request(req, raise_errors, **user_kw):
@@ -169,6 +177,6 @@ def _fileurl(req):
 
 
 def download(req, **user_kw):
-    pool = _create_onetime_pool()
+    pool = _pools['upload']
     r = pool.request('GET', _fileurl(req), **user_kw)
     return r
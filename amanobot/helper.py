@@ -1,4 +1,3 @@
-import inspect
 import logging
 import queue
 import re
@@ -12,6 +11,14 @@ from . import (
     message_identifier, origin_identifier)
 
 
+def _create_invoker(obj, method_name):
+    # Delay the lookup to runtime, like the aio counterpart, so not all handler
+    # methods have to be defined and later rebinding of a handler is honoured.
+    def d(*a, **kw):
+        return getattr(obj, method_name)(*a, **kw)
+    return d
+
+
 class Microphone():
     def __init__(self):
         self._queues = set()
@@ -544,10 +551,14 @@ class CallbackQueryCoordinator():
         for method in delete_methods:
             setattr(proxy, method, self.augment_delete(getattr(bot, method)))
 
+        augmented = frozenset(send_methods + edit_methods + delete_methods)
+
         def public_untouched(nv):
             name, value = nv
             return (not name.startswith('_')
-                    and name not in send_methods + edit_methods + delete_methods)
+                    and name not in augmented)
+
+        import inspect  # only needed here; keep it off the package import path
 
         for name, value in filter(public_untouched, inspect.getmembers(bot)):
             setattr(proxy, name, value)
@@ -1016,10 +1027,14 @@ class Router():
         """
         k = self.key_function(msg)
 
+        # Unpack only the form returned, rather than building all three forms every time.
         if isinstance(k, (tuple, list)):
-            key, args, kwargs = {1: tuple(k) + ((),{}),
-                                 2: tuple(k) + ({},),
-                                 3: tuple(k),}[len(k)]
+            if len(k) == 1:
+                key, args, kwargs = k[0], (), {}
+            elif len(k) == 2:
+                (key, args), kwargs = k, {}
+            else:
+                key, args, kwargs = k
         else:
             key, args, kwargs = k, (), {}
 
@@ -1040,15 +1055,13 @@ class DefaultRouterMixin():
     Install a default :class:`.Router` and the instance method ``on_message()``.
     """
     def __init__(self, *args, **kwargs):
-        self._router = Router(flavor, {'chat': lambda msg: self.on_chat_message(msg),
-                                       'callback_query': lambda msg: self.on_callback_query(msg),
-                                       'inline_query': lambda msg: self.on_inline_query(msg),
-                                       'chosen_inline_result': lambda msg: self.on_chosen_inline_result(msg),
-                                       'shipping_query': lambda msg: self.on_shipping_query(msg),
-                                       'pre_checkout_query': lambda msg: self.on_pre_checkout_query(msg),
-                                       '_idle': lambda event: self.on__idle(event)})
-                                       # use lambda to delay evaluation of self.on_ZZZ to runtime because
-                                       # I don't want to require defining all methods right here.
+        self._router = Router(flavor, {'chat': _create_invoker(self, 'on_chat_message'),
+                                       'callback_query': _create_invoker(self, 'on_callback_query'),
+                                       'inline_query': _create_invoker(self, 'on_inline_query'),
+                                       'chosen_inline_result': _create_invoker(self, 'on_chosen_inline_result'),
+                                       'shipping_query': _create_invoker(self, 'on_shipping_query'),
+                                       'pre_checkout_query': _create_invoker(self, 'on_pre_checkout_query'),
+                                       '_idle': _create_invoker(self, 'on__idle')})
 
         super(DefaultRouterMixin, self).__init__(*args, **kwargs)
 
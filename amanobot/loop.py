@@ -1,11 +1,13 @@
 import collections
-import json
+import heapq
+import itertools
+import logging
 import queue
 import threading
 import time
 import traceback
 
-from . import _find_first_key, flavor_router
+from . import _find_update_type, _json_loads, flavor_router
 from . import exception
 
 
@@ -16,24 +18,47 @@ class RunForeverAsThread():
         t.start()
 
 
+class _NotifyingDeque(collections.deque):
+    """
+    A ``deque`` whose ``put`` wakes up the one thread taking items out. Spares the
+    locking of ``queue.Queue``, which is not needed with a single consumer.
+    """
+    def __init__(self):
+        super().__init__()
+        self.ready = threading.Event()
+
+    def put(self, item):
+        self.append(item)
+        self.ready.set()
+
+    put_nowait = put  # never blocks, the deque is unbounded
+
+
 class CollectLoop(RunForeverAsThread):
     def __init__(self, handle):
         self._handle = handle
-        self._inqueue = queue.Queue()
+        self._inqueue = _NotifyingDeque()
 
     @property
     def input_queue(self):
         return self._inqueue
 
     def run_forever(self):
+        inqueue = self._inqueue
+        ready = inqueue.ready
+        popleft = inqueue.popleft
+        handle = self._handle
         while 1:
-            try:
-                msg = self._inqueue.get(block=True)
-                self._handle(msg)
-            except KeyboardInterrupt:
-                raise
-            except:
-                traceback.print_exc()
+            ready.wait()
+            ready.clear()  # before draining, so no item put meanwhile is missed
+            while inqueue:
+                try:
+                    while inqueue:
+                        handle(popleft())
+                except KeyboardInterrupt:
+                    raise
+                except:
+                    traceback.print_exc()
 
 
 class GetUpdatesLoop(RunForeverAsThread):
@@ -50,6 +75,7 @@ class GetUpdatesLoop(RunForeverAsThread):
         :param timeout: int
         :param allowed_updates: bool
         """
+        wait = relax  # grows on consecutive failures, so an error storm does not spin
         while 1:
             try:
                 result = self._bot.getUpdates(offset=offset,
@@ -59,48 +85,43 @@ class GetUpdatesLoop(RunForeverAsThread):
 
                 # Once passed, this parameter is no longer needed.
                 allowed_updates = None
+                wait = relax
 
                 # No sort. Trust server to give messages in correct order.
                 for update in result:
                     self._update_handler(update)
                     offset = update['update_id'] + 1
 
+                # More updates may be waiting. Ask again without relaxing.
+                if result:
+                    continue
+
+                time.sleep(relax)
+                continue
+
             except exception.BadHTTPResponse as e:
-                traceback.print_exc()
+                logging.exception('getUpdates got a bad HTTP response (status %s)', e.status)
 
                 # Servers probably down. Wait longer.
                 if e.status == 502:
-                    time.sleep(30)
-            except:
-                traceback.print_exc()
-            finally:
-                time.sleep(relax)
+                    wait = max(wait, 30)
+            except Exception:
+                logging.exception('getUpdates failed')
+
+            time.sleep(wait)
+            wait = min(max(wait, 1) * 2, 300)  # grows even if `relax` is 0
 
 
 def _dictify(data):
-    if type(data) is bytes:
-        return json.loads(data.decode('utf-8'))
-    if type(data) is str:
-        return json.loads(data)
-    if type(data) is dict:
+    if isinstance(data, dict):  # most common, check first
         return data
+    if isinstance(data, (str, bytes, bytearray)):
+        return _json_loads(data)  # no need to decode bytes to str first
     raise ValueError()
 
 
 def _extract_message(update):
-    key = _find_first_key(update, ['message',
-                                   'edited_message',
-                                   'channel_post',
-                                   'edited_channel_post',
-                                   'inline_query',
-                                   'chosen_inline_result',
-                                   'callback_query',
-                                   'shipping_query',
-                                   'pre_checkout_query',
-                                   'poll',
-                                   'poll_answer',
-                                   'my_chat_member',
-                                   'chat_member'])
+    key = _find_update_type(update)
     return key, update[key]
 
 
@@ -120,7 +141,8 @@ class MessageLoop(RunForeverAsThread):
     def run_forever(self, *args, **kwargs):
         """
         :type relax: float
-        :param relax: seconds between each :meth:`.getUpdates`
+        :param relax:
+            seconds between each :meth:`.getUpdates` that brings no updates or fails
 
         :type offset: int
         :param offset:
@@ -185,9 +207,34 @@ class Orderer(RunForeverAsThread):
 
         # Here is the re-ordering mechanism, ensuring in-order delivery of updates.
         max_id = None                 # max update_id passed to callback
-        buffer = collections.deque()  # keep those updates which skip some update_id
+        heap = []                     # keep those updates which skip some update_id,
+                                      # as (update_id, seq, expiry time, update)
+        seq = itertools.count()       # tie-breaker, so duplicate update_ids never compare the updates
         qwait = None                  # how long to wait for updates,
-                                      # because buffer's content has to be returned in time.
+                                      # because heap's content has to be returned in time.
+        monotonic = time.monotonic    # unaffected by system clock changes
+
+        def handle_held(max_id):
+            # handle held updates that have become contagious, drop duplicates on the way
+            while heap and heap[0][0] <= max_id + 1:
+                update_id, _, _, update = heapq.heappop(heap)
+                if update_id == max_id + 1:
+                    max_id = handle(update)
+            return max_id
+
+        def handle_expired(max_id):
+            # A gap has waited as long as the earliest held update above it. So once an
+            # update has been held for `maxhold`, skip every gap below it, handling the
+            # held updates on the way.
+            now = monotonic()
+            top = max((e[0] for e in heap if e[2] <= now), default=None)
+            if top is None:
+                return max_id
+            while heap and heap[0][0] <= top:
+                update_id, _, _, update = heapq.heappop(heap)
+                if update_id > max_id:  # drop duplicates
+                    max_id = handle(update)
+            return handle_held(max_id)
 
         while 1:
             try:
@@ -201,30 +248,13 @@ class Orderer(RunForeverAsThread):
                     # No update_id skipped, handle naturally.
                     max_id = handle(update)
 
-                    # clear contagious updates in buffer
-                    if len(buffer) > 0:
-                        buffer.popleft()  # first element belongs to update just received, useless now.
-                        while 1:
-                            try:
-                                if type(buffer[0]) is dict:
-                                    max_id = handle(buffer.popleft())  # updates that arrived earlier, handle them.
-                                else:
-                                    break  # gap, no more contagious updates
-                            except IndexError:
-                                break  # buffer empty
+                    # updates that arrived earlier, handle them.
+                    if heap:
+                        max_id = handle_held(max_id)
 
                 elif update['update_id'] > max_id + 1:
-                    # Update arrives pre-maturely, insert to buffer.
-                    nbuf = len(buffer)
-                    if update['update_id'] <= max_id + nbuf:
-                        # buffer long enough, put update at position
-                        buffer[update['update_id'] - max_id - 1] = update
-                    else:
-                        # buffer too short, lengthen it
-                        expire = time.time() + maxhold
-                        for a in range(nbuf, update['update_id']-max_id-1):
-                            buffer.append(expire)  # put expiry time in gaps
-                        buffer.append(update)
+                    # Update arrives pre-maturely, hold it.
+                    heapq.heappush(heap, (update['update_id'], next(seq), monotonic() + maxhold, update))
 
                 else:
                     pass  # discard
@@ -233,34 +263,20 @@ class Orderer(RunForeverAsThread):
                 # debug message
                 # print('Timeout')
 
-                # some buffer contents have to be handled
-                # flush buffer until a non-expired time is encountered
-                while 1:
-                    try:
-                        if type(buffer[0]) is dict:
-                            max_id = handle(buffer.popleft())
-                        else:
-                            expire = buffer[0]
-                            if expire <= time.time():
-                                max_id += 1
-                                buffer.popleft()
-                            else:
-                                break  # non-expired
-                    except IndexError:
-                        break  # buffer empty
+                # some held updates have to be handled
+                max_id = handle_expired(max_id)
             except:
                 traceback.print_exc()
             finally:
-                try:
-                    # don't wait longer than next expiry time
-                    qwait = buffer[0] - time.time()
-                    qwait = max(qwait, 0)
-                except IndexError:
-                    # buffer empty, can wait forever
+                if heap:
+                    # don't wait longer than the earliest expiry time
+                    qwait = max(min(e[2] for e in heap) - monotonic(), 0)
+                else:
+                    # heap empty, can wait forever
                     qwait = None
 
                 # debug message
-                # print ('Buffer:', str(buffer), ', To Wait:', qwait, ', Max ID:', max_id)
+                # print ('Heap:', str(heap), ', To Wait:', qwait, ', Max ID:', max_id)
 
 
 class OrderedWebhook(RunForeverAsThread):
@@ -11,9 +11,10 @@ Things to remember:
    function, you can customize it to your liking.
 """
 
+import operator
 import re
 
-from . import glance, _isstring, all_content_types
+from . import glance, all_content_types
 
 
 def by_content_type():
@@ -34,7 +35,7 @@ def by_command(extractor, prefix=('/',), separator=' ', pass_args=False):
     :param extractor:
         a function that takes one argument (the message) and returns a portion
         of message to be interpreted. To extract the text of a chat message,
-        use ``lambda msg: msg['text']``.
+        use ``operator.itemgetter('text')``.
 
     :param prefix:
         a list of special characters expected to indicate the head of a command.
@@ -86,28 +87,28 @@ def by_chat_command(prefix=('/',), separator=' ', pass_args=False):
         ``(None,)`` as the key. This is to distinguish with the special
         ``None`` key in routing table.
     """
-    return by_command(lambda msg: msg['text'], prefix, separator, pass_args)
+    return by_command(operator.itemgetter('text'), prefix, separator, pass_args)
 
 def by_text():
     """
     :return:
         a key function that returns a message's ``text`` field.
     """
-    return lambda msg: msg['text']
+    return operator.itemgetter('text')
 
 def by_data():
     """
     :return:
         a key function that returns a message's ``data`` field.
     """
-    return lambda msg: msg['data']
+    return operator.itemgetter('data')
 
 def by_regex(extractor, regex, key=1):
     """
     :param extractor:
         a function that takes one argument (the message) and returns a portion
         of message to be interpreted. To extract the text of a chat message,
-        use ``lambda msg: msg['text']``.
+        use ``operator.itemgetter('text')``.
 
     :type regex: str or regex object
     :param regex: the pattern to look for
@@ -120,14 +121,15 @@ def by_regex(extractor, regex, key=1):
         If no match is found, it returns a 1-tuple ``(None,)`` as the key.
         This is to distinguish with the special ``None`` key in routing table.
     """
-    if _isstring(regex):
+    if isinstance(regex, str):
         regex = re.compile(regex)
 
+    index = key if isinstance(key, tuple) else (key,)
+
     def f(msg):
         text = extractor(msg)
         match = regex.search(text)
         if match:
-            index = key if isinstance(key, tuple) else (key,)
             return match.group(*index), (match,)
         return (None,),  # to distinguish with `None`
     return f
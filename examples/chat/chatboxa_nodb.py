@@ -37,20 +37,12 @@ class UnreadStore():
 
     def put(self, msg):
         chat_id = msg['chat']['id']
-
-        if chat_id not in self._db:
-            self._db[chat_id] = []
-
-        self._db[chat_id].append(msg)
+        self._db.setdefault(chat_id, []).append(msg)
 
     # Pull all unread messages of a `chat_id`
     def pull(self, chat_id):
-        messages = self._db[chat_id]
-        del self._db[chat_id]
-
-        # sort by date
-        messages.sort(key=lambda m: m['date'])
-        return messages
+        # Messages are put in the order they arrive, which is already by date.
+        return self._db.pop(chat_id)
 
     # Tells how many unread messages per chat_id
     def unread_per_chat(self):
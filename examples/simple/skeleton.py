@@ -1,5 +1,6 @@
 import sys
-import time
+import signal
+import threading
 import amanobot
 from amanobot.loop import MessageLoop
 
@@ -22,6 +23,7 @@ bot = amanobot.Bot(TOKEN)
 MessageLoop(bot, handle).run_as_thread()
 print('Listening ...')
 
-# Keep the program running.
-while 1:
-    time.sleep(10)
+# Keep the program running, without waking up, until Ctrl-C.
+stop = threading.Event()
+signal.signal(signal.SIGINT, lambda *args: stop.set())
+stop.wait()
@@ -4,10 +4,18 @@ import amanobot
 import amanobot.aio
 from amanobot.aio.loop import MessageLoop
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 """
 $ python3 skeletona.py <token>
 
-A skeleton for your async amanobot programs.
+A skeleton for your async amanobot programs. Needs Python 3.7+, for ``asyncio.run()``.
+
+If uvloop is installed (``pip install amanobot[fast]``), it is used as a faster
+drop-in event loop.
 """
 
 def handle(msg):
@@ -17,12 +25,19 @@ def handle(msg):
     print(flavor, summary)
 
 
-TOKEN = sys.argv[1]  # get token from command-line
+async def main():
+    bot = amanobot.aio.Bot(TOKEN)  # picks up the running loop
+
+    await MessageLoop(bot, handle).run_forever()
+    print('Listening ...')
 
-bot = amanobot.aio.Bot(TOKEN)
-loop = asyncio.get_event_loop()
+    # Keep the program running.
+    await asyncio.Event().wait()
+
+
+TOKEN = sys.argv[1]  # get token from command-line
 
-loop.create_task(MessageLoop(bot, handle).run_forever())
-print('Listening ...')
+if uvloop is not None:
+    uvloop.install()  # before any loop is created
 
-loop.run_forever()
+asyncio.run(main())
@@ -23,9 +23,9 @@ class MessageCounter(amanobot.aio.helper.ChatHandler):
         await self.sender.sendMessage(self._count)
 
 async def feeder(request):
-    data = await request.text()
+    data = await request.read()  # feed() parses bytes as they are, no need to decode
     webhook.feed(data)
-    return web.Response(body='OK'.encode('utf-8'))
+    return web.Response(body=b'OK')
 
 async def init(app, bot):
     app.router.add_route('GET', '/webhook', feeder)
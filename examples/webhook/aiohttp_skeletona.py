@@ -38,9 +38,9 @@ def on_chosen_inline_result(msg):
     print('Chosen Inline Result:', result_id, from_id, query_string)
 
 async def feeder(request):
-    data = await request.text()
+    data = await request.read()  # feed() parses bytes as they are, no need to decode
     webhook.feed(data)
-    return web.Response(body='OK'.encode('utf-8'))
+    return web.Response(body=b'OK')
 
 async def init(app, bot):
     app.router.add_route('GET', '/webhook', feeder)
@@ -10,6 +10,9 @@ $ python3 flask_counter.py <token> <listening_port> <webhook_url>
 Webhook path is '/webhook', therefore:
 
 <webhook_url>: https://<base>/webhook
+
+Flask's built-in server is meant for development. For heavy traffic, see the
+async version, aiohttp_countera.py, or serve `app` with a production WSGI server.
 """
 
 class MessageCounter(amanobot.helper.ChatHandler):
@@ -48,4 +51,4 @@ if __name__ == '__main__':
         pass
 
     webhook.run_as_thread()
-    app.run(port=PORT, debug=True)
+    app.run(port=PORT)
@@ -4,8 +4,6 @@ import re
 
 here = path.abspath(path.dirname(__file__))
 
-cmdclass = {}
-
 # Parse version
 with open(path.join(here, 'amanobot', '__init__.py')) as f:
     version = re.findall(r"__version__ = '(.+)'", f.read())[0]
@@ -14,12 +12,14 @@ with open('README.md') as f:
     long_desc = f.read()
 
 setup(
-    cmdclass=cmdclass,
-
     name='amanobot',
     packages=['amanobot', 'amanobot.aio'],
 
     install_requires=['urllib3>=1.25.11', 'aiohttp>=3.7.2'],
+    extras_require={
+        # Optional speedups, picked up automatically when installed
+        'fast': ['orjson', "uvloop>=0.17; platform_system!='Windows'"],
+    },
     python_requires='>=3.5.3',
 
     version=version,
@@ -1,4 +1,6 @@
 import sys
+import signal
+import threading
 import time
 import amanobot
 import amanobot.namedtuple
@@ -75,5 +77,7 @@ bot = AdminBot(TOKEN)
 bot.message_loop()
 print('Send me a text message ...')
 
-while 1:
-    time.sleep(1)
+stop = threading.Event()
+signal.signal(signal.SIGINT, lambda *args: stop.set())
+signal.signal(signal.SIGTERM, lambda *args: stop.set())
+stop.wait()
@@ -1,7 +1,9 @@
 # coding=utf8
 
 import pprint
+import signal
 import sys
+import threading
 import traceback
 import random
 import amanobot
@@ -10,20 +12,27 @@ from amanobot.namedtuple import (
     InlineQueryResultArticle, InlineQueryResultPhoto, InlineQueryResultGame)
 
 def equivalent(data, nt):
-    if type(data) is dict:
-        keys = data.keys()
-
-        # number of dictionary keys == number of non-None values in namedtuple?
-        if len(keys) != len([f for f in nt._fields if getattr(nt, f) is not None]):
-            return False
-
-        # map `from` to `from_`
-        fields = list(map(lambda k: k+'_' if k in ['from'] else k, keys))
-
-        return all(map(equivalent, [data[k] for k in keys], [getattr(nt, f) for f in fields]))
-    if type(data) is list:
-        return all(map(equivalent, data, nt))
-    return data==nt
+    # Walk both trees side by side, with a stack instead of recursion.
+    stack = [(data, nt)]
+    while stack:
+        data, nt = stack.pop()
+        dt = type(data)
+        if dt is not dict and dt is not list:
+            # most leaves are plain values, check them first
+            if data != nt:
+                return False
+        elif dt is dict:
+            keys = list(data.keys())
+
+            # number of dictionary keys == number of non-None values in namedtuple?
+            if len(keys) != sum(1 for v in nt if v is not None):
+                return False
+
+            # map `from` to `from_`
+            stack.extend((data[k], getattr(nt, k+'_' if k == 'from' else k)) for k in keys)
+        else:
+            stack.extend(zip(data, nt))
+    return True
 
 def examine(result, type):
     try:
@@ -36,28 +45,29 @@ def examine(result, type):
         pprint.pprint(nt)
         print()
     except AssertionError:
+        # Runs in the bot's collector thread: report and keep answering queries,
+        # rather than holding up every update behind a prompt.
         traceback.print_exc()
-        answer = raw_input('Do you want to continue? [y] ')
-        if answer != 'y':
-            sys.exit(1)
 
-def on_inline_query(msg):
-    def compute():
-        articles = [InlineQueryResultArticle(
-                       id='abc', title='HK', input_message_content=InputTextMessageContent(message_text='Hong Kong'), url='https://www.google.com', hide_url=True),
-                   {'type': 'article',
-                       'id': 'def', 'title': 'SZ', 'input_message_content': {'message_text': 'Shenzhen'}, 'url': 'https://www.yahoo.com'}]
+# Built once, shared by every answer
+articles = [InlineQueryResultArticle(
+               id='abc', title='HK', input_message_content=InputTextMessageContent(message_text='Hong Kong'), url='https://www.google.com', hide_url=True),
+           {'type': 'article',
+               'id': 'def', 'title': 'SZ', 'input_message_content': {'message_text': 'Shenzhen'}, 'url': 'https://www.yahoo.com'}]
 
-        photos = [InlineQueryResultPhoto(
-                      id='123', photo_url='https://core.telegram.org/file/811140934/1/tbDSLHSaijc/fdcc7b6d5fb3354adf', thumb_url='https://core.telegram.org/file/811140934/1/tbDSLHSaijc/fdcc7b6d5fb3354adf'),
-                  {'type': 'photo',
-                      'id': '345', 'photo_url': 'https://core.telegram.org/file/811140184/1/5YJxx-rostA/ad3f74094485fb97bd', 'thumb_url': 'https://core.telegram.org/file/811140184/1/5YJxx-rostA/ad3f74094485fb97bd', 'caption': 'Caption', 'title': 'Title', 'input_message_content': {'message_text': 'Shenzhen'}}]
+photos = [InlineQueryResultPhoto(
+              id='123', photo_url='https://core.telegram.org/file/811140934/1/tbDSLHSaijc/fdcc7b6d5fb3354adf', thumb_url='https://core.telegram.org/file/811140934/1/tbDSLHSaijc/fdcc7b6d5fb3354adf'),
+          {'type': 'photo',
+              'id': '345', 'photo_url': 'https://core.telegram.org/file/811140184/1/5YJxx-rostA/ad3f74094485fb97bd', 'thumb_url': 'https://core.telegram.org/file/811140184/1/5YJxx-rostA/ad3f74094485fb97bd', 'caption': 'Caption', 'title': 'Title', 'input_message_content': {'message_text': 'Shenzhen'}}]
 
-        games = [InlineQueryResultGame(
-                    id='abc', game_short_name='sunchaser')]
+games = [InlineQueryResultGame(
+            id='abc', game_short_name='sunchaser')]
 
-        results = random.choice([articles, photos, games])
-        return results
+all_results = [articles, photos, games]
+
+def on_inline_query(msg):
+    def compute():
+        return random.choice(all_results)
 
     query_id, from_id, query = amanobot.glance(msg, flavor='inline_query')
 
@@ -106,4 +116,9 @@ answerer = amanobot.helper.Answerer(bot)
 bot.sendMessage(USER_ID, 'Please give me an inline query.')
 
 bot.message_loop({'inline_query': on_inline_query,
-                  'chosen_inline_result': on_chosen_inline_result}, run_forever=True)
+                  'chosen_inline_result': on_chosen_inline_result})
+
+stop = threading.Event()
+signal.signal(signal.SIGINT, lambda *args: stop.set())
+signal.signal(signal.SIGTERM, lambda *args: stop.set())
+stop.wait()
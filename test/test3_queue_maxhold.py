@@ -0,0 +1,62 @@
+import queue
+import time
+import amanobot
+from amanobot.loop import OrderedWebhook
+
+"""
+$ python3 test3_queue_maxhold.py
+
+No update may be held longer than `maxhold`, whatever arrives after it.
+
+Feeds update_ids 1, 5, 4, 3 at 0, 0.05, 0.85 and 1.65 seconds, with maxhold=1.
+4 and 5 have to be handed out at about 1.05 seconds, and the late 3 discarded.
+"""
+
+def u(update_id):
+    return { 'update_id': update_id, 'message': update_id }
+
+arrivals = [
+    (0,    u(1)),  # initialize
+    (0.05, u(5)),  # 3-gap, expires at 1.05
+    (0.85, u(4)),  # lower id held later, must not delay 5
+    (1.65, u(3)),  # too late, discard
+]
+
+def feed(put):
+    start = time.monotonic()
+    for at, update in arrivals:
+        time.sleep(max(start + at - time.monotonic(), 0))
+        put(update)
+    return start
+
+def check(name, received, start):
+    print(name, [(i, round(t - start, 2)) for i, t in received])
+
+    assert [i for i, t in received] == [1, 4, 5], received
+    for i, t in received[1:]:
+        assert 0.95 < t - start < 1.4, (i, t - start)
+
+
+received = []
+
+def handle(msg):
+    received.append((msg, time.monotonic()))
+
+bot = amanobot.Bot('abc')
+q = queue.Queue()
+bot.message_loop(handle, source=q, maxhold=1)
+
+start = feed(q.put)
+time.sleep(1)
+check('Bot.message_loop', received, start)
+
+
+received = []
+
+bot = amanobot.Bot('abc')
+webhook = OrderedWebhook(bot, handle)
+webhook.run_as_thread(maxhold=1)
+
+start = feed(webhook.feed)
+time.sleep(1)
+check('OrderedWebhook', received, start)
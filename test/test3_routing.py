@@ -4,17 +4,19 @@ import random
 import amanobot.helper
 from amanobot.routing import (by_content_type, make_content_type_routing_table,
                              lower_key, by_chat_command, make_routing_table,
-                             by_regex)
+                             by_regex, by_text)
+
+random_keys = [
+    0,
+    (1,),
+    (2, ('a1',)),
+    (3, ('a1', 'a2'), {'b1': 'b'}),
+    (4, (), {'kw4': 4444, 'kw5': 'xyz'}),
+    ((None,), ()),
+]
 
 def random_key(msg):
-    return random.choice([
-        0,
-        (1,),
-        (2, ('a1',)),
-        (3, ('a1', 'a2'), {'b1': 'b'}),
-        (4, (), {'kw4': 4444, 'kw5': 'xyz'}),
-        ((None,), ()),
-    ])
+    return random.choice(random_keys)
 
 def zero(msg):
     print('Zero')
@@ -133,7 +135,7 @@ class RegexHandler():
         print('%s does not exist' % match.group(1), msg)
 
 regex_handler = RegexHandler()
-regex_router = amanobot.helper.Router(by_regex(lambda msg: msg['text'], '(CS[0-9]{3})'),
+regex_router = amanobot.helper.Router(by_regex(by_text(), '(CS[0-9]{3})'),
                                      make_routing_table(regex_handler, [
                                          'CS101',
                                          'CS202',
@@ -2,7 +2,9 @@
 
 import time
 import pprint
+import signal
 import sys
+import threading
 import traceback
 import urllib.request
 import amanobot
@@ -27,20 +29,27 @@ Ctrl-C to kill it, then run the proper command again.
 """
 
 def equivalent(data, nt):
-    if type(data) is dict:
-        keys = list(data.keys())
-
-        # number of dictionary keys == number of non-None values in namedtuple?
-        if len(keys) != len([f for f in nt._fields if getattr(nt, f) is not None]):
-            return False
-
-        # map `from` to `from_`
-        fields = [k+'_' if k in ['from'] else k for k in keys]
-
-        return all(map(equivalent, [data[k] for k in keys], [getattr(nt, f) for f in fields]))
-    if type(data) is list:
-        return all(map(equivalent, data, nt))
-    return data==nt
+    # Walk both trees side by side, with a stack instead of recursion.
+    stack = [(data, nt)]
+    while stack:
+        data, nt = stack.pop()
+        dt = type(data)
+        if dt is not dict and dt is not list:
+            # most leaves are plain values, check them first
+            if data != nt:
+                return False
+        elif dt is dict:
+            keys = list(data.keys())
+
+            # number of dictionary keys == number of non-None values in namedtuple?
+            if len(keys) != sum(1 for v in nt if v is not None):
+                return False
+
+            # map `from` to `from_`
+            stack.extend((data[k], getattr(nt, k+'_' if k == 'from' else k)) for k in keys)
+        else:
+            stack.extend(zip(data, nt))
+    return True
 
 def examine(result, type):
     try:
@@ -372,4 +381,9 @@ test_webhook_getupdates_exclusive()
 get_user_profile_photos()
 
 print('Text me to start.')
-bot.message_loop(send_everything_on_contact, run_forever=True)
+bot.message_loop(send_everything_on_contact)
+
+stop = threading.Event()
+signal.signal(signal.SIGINT, lambda *args: stop.set())
+signal.signal(signal.SIGTERM, lambda *args: stop.set())
+stop.wait()
@@ -1,7 +1,9 @@
 # coding=utf8
 
 import pprint
+import signal
 import sys
+import threading
 import traceback
 import amanobot
 import amanobot.namedtuple
@@ -23,20 +25,27 @@ Ctrl-C to kill it, then run the proper command again.
 """
 
 def equivalent(data, nt):
-    if type(data) is dict:
-        keys = list(data.keys())
-
-        # number of dictionary keys == number of non-None values in namedtuple?
-        if len(keys) != len([f for f in nt._fields if getattr(nt, f) is not None]):
-            return False
-
-        # map `from` to `from_`
-        fields = [k+'_' if k in ['from'] else k for k in keys]
-
-        return all(map(equivalent, [data[k] for k in keys], [getattr(nt, f) for f in fields]))
-    if type(data) is list:
-        return all(map(equivalent, data, nt))
-    return data==nt
+    # Walk both trees side by side, with a stack instead of recursion.
+    stack = [(data, nt)]
+    while stack:
+        data, nt = stack.pop()
+        dt = type(data)
+        if dt is not dict and dt is not list:
+            # most leaves are plain values, check them first
+            if data != nt:
+                return False
+        elif dt is dict:
+            keys = list(data.keys())
+
+            # number of dictionary keys == number of non-None values in namedtuple?
+            if len(keys) != sum(1 for v in nt if v is not None):
+                return False
+
+            # map `from` to `from_`
+            stack.extend((data[k], getattr(nt, k+'_' if k == 'from' else k)) for k in keys)
+        else:
+            stack.extend(zip(data, nt))
+    return True
 
 def examine(result, type):
     try:
@@ -91,4 +100,9 @@ bot = amanobot.Bot(TOKEN)
 expected_content_type = content_type_iterator.__next__()
 bot.sendMessage(USER_ID, 'Please give me a %s.' % expected_content_type)
 
-bot.message_loop(see_every_content_types, run_forever=True)
+bot.message_loop(see_every_content_types)
+
+stop = threading.Event()
+signal.signal(signal.SIGINT, lambda *args: stop.set())
+signal.signal(signal.SIGTERM, lambda *args: stop.set())
+stop.wait()
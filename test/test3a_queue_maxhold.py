@@ -0,0 +1,49 @@
+import asyncio
+import time
+import amanobot.aio
+
+"""
+$ python3 test3a_queue_maxhold.py
+
+No update may be held longer than `maxhold`, whatever arrives after it.
+
+Feeds update_ids 1, 5, 4, 3 at 0, 0.05, 0.85 and 1.65 seconds, with maxhold=1.
+4 and 5 have to be handed out at about 1.05 seconds, and the late 3 discarded.
+"""
+
+def u(update_id):
+    return { 'update_id': update_id, 'message': update_id }
+
+arrivals = [
+    (0,    u(1)),  # initialize
+    (0.05, u(5)),  # 3-gap, expires at 1.05
+    (0.85, u(4)),  # lower id held later, must not delay 5
+    (1.65, u(3)),  # too late, discard
+]
+
+received = []
+
+def handle(msg):
+    received.append((msg, time.monotonic()))
+
+async def feed():
+    start = time.monotonic()
+    for at, update in arrivals:
+        await asyncio.sleep(max(start + at - time.monotonic(), 0))
+        q.put_nowait(update)
+    await asyncio.sleep(1)
+
+    print('Bot.message_loop', [(i, round(t - start, 2)) for i, t in received])
+
+    assert [i for i, t in received] == [1, 4, 5], received
+    for i, t in received[1:]:
+        assert 0.95 < t - start < 1.4, (i, t - start)
+    print('OK')
+
+bot = amanobot.aio.Bot('abc')
+q = asyncio.Queue()
+
+loop = asyncio.get_event_loop()
+loop.create_task(bot.message_loop(handle, source=q, maxhold=1))
+loop.create_task(feed())
+loop.run_forever()